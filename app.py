@@ -38,20 +38,51 @@ async def main():
     # Запрос GET информация о интрадейных свечах
     # await examples.fetch_intraday_candles(client)
     
+    # Запрос GET интрадейные свечи в виде колоночной серии CandleSeries
+    # await examples.fetch_intraday_candles_series(client)
+
+    # Запрос интрадейных свечей с потоковым декодированием в пуле потоков
+    # await examples.fetch_candles_streaming(client)
+    
+    # Построение свечей M15, H1 и D1 из минутных свечей без дополнительных запросов
+    # await examples.resample_intraday_candles(client)
+    
+    # Загрузка длинной истории интрадейных свечей окнами
+    # await examples.backfill_intraday_candles(client)
+    
+    # Запрос свечей через локальное хранилище
+    # (клиент нужно создать с параметром candle_store=CandleStore("candles"))
+    # await examples.fetch_cached_candles(client)
+    
+    # Пакетный запрос дневных свечей по списку инструментов
+    # await examples.fetch_day_candles_batch(client)
+    
     # Запрос GET информация о портфеле клиента 
     # await examples.fetch_portfolio(client, TRANSAQ_TOKEN)
     
     # Запрос информации по тикеру
     # await examples.fetch_securities(client)
    
+    # Поиск параметров инструмента в справочнике в памяти
+    # await examples.lookup_securities(client)
+   
     # Запрос POST поручение на размещение ордера
     # await examples.place_order(client=client, client_id=TRANSAQ_TOKEN)
 
+    # Запрос POST размещение ордеров по шаблону через выделенный канал
+    # await examples.place_orders_fast(client=client, client_id=TRANSAQ_TOKEN)
+
     # Запрос GET информация о размещенных, отмененных, исполненных ордерах
     # await examples.get_orders(client=client, clieclent_id=TRANSAQ_TOKEN)
 
+    # Отслеживание изменений ордеров в фоне
+    # await examples.track_orders(client=client, client_id=TRANSAQ_TOKEN)
+
     # Запрос DELETE снятие ордера по номеру транзакции
     # await examples.delete_order(client=client, client_id=TRANSAQ_TOKEN)
+
+    # Закрываем пул соединений клиента после выполнения всех запросов
+    await client.close()
     
 
 # Проверка, запущен ли скрипт непосредственно, и, если да, запуск главной функции.
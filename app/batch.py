@@ -0,0 +1,61 @@
+"""
+Пакетные запросы по списку инструментов приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+import time
+
+import app.settings as settings
+from app.models import BatchResult, SymbolResult
+
+
+# Асинхронный генератор для пакетного запроса по списку инструментов.
+async def iter_batch(symbols: list, fetch, concurrency: int = settings.BATCH_CONCURRENCY):
+    """
+    Выполняет запрос по каждому инструменту с ограниченной конкурентностью
+    и отдает результаты по мере завершения. Ошибка по одному инструменту
+    не прерывает остальные запросы.
+    :param symbols: Список пар (режим торгов, код инструмента).
+    :param fetch: Корутинная функция fetch(board, code), выполняющая запрос.
+    :param concurrency: Максимум одновременных запросов.
+    :return: Асинхронный генератор SymbolResult в порядке завершения.
+    """
+    symbols = list(symbols)
+    pending = asyncio.Queue()
+    for symbol in symbols:
+        pending.put_nowait(symbol)
+    done = asyncio.Queue()
+
+    # Обработчик, последовательно забирающий инструменты из очереди.
+    async def worker():
+        while not pending.empty():
+            board, code = pending.get_nowait()
+            started = time.perf_counter()
+            try:
+                value, error = await fetch(board, code), None
+            except Exception as exc:
+                value, error = None, exc
+            done.put_nowait(SymbolResult(board, code, value, error, time.perf_counter() - started))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(max(1, concurrency), len(symbols)))]
+    try:
+        for _ in symbols:
+            yield await done.get()
+    finally:
+        # При досрочной остановке генератора отменяем оставшиеся запросы.
+        for task in workers:
+            task.cancel()
+
+
+# Асинхронная функция для сбора результатов пакетного запроса.
+async def collect(results) -> BatchResult:
+    """
+    Собирает результаты асинхронного генератора SymbolResult.
+    :param results: Асинхронный генератор SymbolResult.
+    :return: Результаты, ошибки и время запросов по инструментам.
+    """
+    batch = BatchResult()
+    async for item in results:
+        batch.add(item)
+    return batch
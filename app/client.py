@@ -1,5 +1,16 @@
+import asyncio # для конкурентной загрузки окон истории
+from collections import deque # очередь загружаемых окон истории
+from concurrent.futures import ProcessPoolExecutor # пул процессов для декодирования ответов
+from datetime import datetime, timedelta, timezone
 import aiohttp #  для асинхронных HTTP-запросов
 import json # для работы с размещением ордера в формате json
+import app.settings as settings
+from app.batch import collect, iter_batch
+from app.decoding import CandleStreamDecoder
+from app.models import BatchResult, CandleSeries, Security, check_response, unwrap_response
+from app.scheduler import GROUP_ACCOUNT, GROUP_DATA, GROUP_ORDERS, RequestScheduler
+from app.utils import (DAY_TIME_FRAME_MINUTES, TIME_FRAME_MINUTES, format_time, from_timestamp,
+                       parse_time, split_interval, to_timestamp)
 
 # Определяем класс TradeAPIClient, который будет клиентом API.
 class TradeAPIClient:
@@ -8,16 +19,229 @@ class TradeAPIClient:
     Позволяет выполнять асинхронные запросы к API для проверки токенов доступа.
     """
     
-    # Конструктор класса, принимает два параметра: токен API и базовый URL API.
-    def __init__(self, api_token: str, api_url: str):
+    # Конструктор класса, принимает токен API, базовый URL API и параметры пула соединений.
+    def __init__(
+            self,
+            api_token: str,
+            api_url: str,
+            connection_limit: int = settings.CONNECTION_LIMIT,
+            connection_limit_per_host: int = settings.CONNECTION_LIMIT_PER_HOST,
+            dns_cache_ttl: int = settings.DNS_CACHE_TTL,
+            keepalive_timeout: float = settings.KEEPALIVE_TIMEOUT,
+            request_timeout: float = settings.REQUEST_TIMEOUT,
+            connect_timeout: float = settings.CONNECT_TIMEOUT,
+            verify_ssl: bool = True,
+            candle_store=None,
+            scheduler: RequestScheduler = None,
+            instrumentation=None,
+            decode_executor=None,
+            stream_decoding: bool = False):
         """
         Инициализация клиента API.
         :param api_token: Ключ API для доступа к сервису.
         :param api_url: Базовый URL API, к которому будут отправляться запросы.
+        :param connection_limit: Общий лимит одновременных соединений в пуле.
+        :param connection_limit_per_host: Лимит одновременных соединений к одному хосту.
+        :param dns_cache_ttl: Время жизни кэша DNS в секундах.
+        :param keepalive_timeout: Время удержания простаивающего соединения в секундах.
+        :param request_timeout: Общий таймаут запроса в секундах.
+        :param connect_timeout: Таймаут установки соединения в секундах.
+        :param verify_ssl: Проверять ли SSL-сертификат сервера.
+        :param candle_store: Локальное хранилище свечей CandleStore для get_candles_cached.
+        :param scheduler: Планировщик запросов с лимитами и приоритетами.
+                          По умолчанию создается планировщик с лимитами из settings.
+        :param instrumentation: Сбор метрик запросов Instrumentation (по умолчанию отключен).
+        :param decode_executor: Пул потоков или процессов (concurrent.futures) для декодирования
+                                ответов вне цикла событий. По умолчанию ответы декодируются в цикле событий.
+        :param stream_decoding: Декодировать свечи по мере получения тела ответа, не собирая его целиком.
+                                С пулом процессов не применяется: тело передается в процесс целиком.
         """
         # Сохраняем полученные значения в атрибутах объекта класса.
         self.base_url = api_url
         self.headers = {"accept": "text/plain", "X-Api-Key": api_token}
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout)
+        self.verify_ssl = verify_ssl
+        self.candle_store = candle_store
+        self.scheduler = scheduler or RequestScheduler()
+        self.instrumentation = instrumentation
+        self.decode_executor = decode_executor
+        self.stream_decoding = stream_decoding
+        # Сессия создается лениво при первом запросе и переиспользуется всеми методами.
+        self._session = None
+
+    # Вход в асинхронный контекстный менеджер: заранее открываем сессию.
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    # Выход из асинхронного контекстного менеджера: закрываем пул соединений.
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Метод для получения общей сессии с пулом соединений.
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает долгоживущую сессию клиента, создавая ее при необходимости.
+        Сессия держит keep-alive соединения и кэширует DNS, поэтому
+        повторные запросы не тратят время на рукопожатия TCP/TLS.
+        """
+        if self._session is None or self._session.closed:
+            self._session = self._create_session(self.connection_limit, self.connection_limit_per_host)
+        return self._session
+
+    # Метод для создания сессии с собственным пулом соединений.
+    def _create_session(self, limit: int, limit_per_host: int) -> aiohttp.ClientSession:
+        """
+        Создает сессию с пулом keep-alive соединений и кэшем DNS по настройкам клиента.
+        :param limit: Общий лимит одновременных соединений.
+        :param limit_per_host: Лимит одновременных соединений к одному хосту.
+        :return: Новая сессия aiohttp.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            ssl=None if self.verify_ssl else False)
+        trace_configs = [self.instrumentation.trace_config] if self.instrumentation is not None else None
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=trace_configs)
+
+    # Асинхронный метод для закрытия пула соединений.
+    async def close(self):
+        """
+        Закрывает сессию клиента и все соединения пула.
+        После закрытия следующий запрос откроет новую сессию.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # Асинхронный метод для отправки запроса через планировщик и общую сессию.
+    async def _request(self, method: str, url: str, group: str = GROUP_DATA, **kwargs) -> str:
+        """
+        Отправляет запрос через планировщик и общую сессию клиента.
+        :param method: HTTP-метод запроса (GET, POST, DELETE).
+        :param url: Полный URL запроса.
+        :param group: Группа эндпоинтов для лимитов и приоритета (orders, account, data).
+        :param kwargs: Дополнительные параметры aiohttp (params, json, ssl).
+        :return: Ответ сервера в текстовом формате.
+        """
+        # Размещение ордера не повторяется после ответа 5xx, чтобы не выставить его дважды.
+        return await self.scheduler.submit(
+            group, lambda: self._send(method, url, **kwargs), idempotent=method != "POST")
+
+    # Асинхронный метод для непосредственной отправки запроса через общую сессию.
+    async def _send(self, method: str, url: str, **kwargs) -> tuple:
+        """
+        Отправляет запрос через общую сессию клиента без участия планировщика.
+        :return: HTTP-статус, значение заголовка Retry-After и текст ответа.
+        """
+        session = self._get_session()
+        started = asyncio.get_running_loop().time()
+        async with session.request(method, url, headers=self.headers, **kwargs) as response:
+            text = await self._read(response, response.text, started)
+            return response.status, response.headers.get("Retry-After"), text
+
+    # Асинхронный метод для запроса свечей с потоковым декодированием.
+    async def _send_candles(self, url: str) -> tuple:
+        """
+        Отправляет запрос свечей через общую сессию клиента без участия планировщика.
+        При потоковом декодировании тело ответа разбирается по частям STREAM_CHUNK_SIZE.
+        :return: HTTP-статус, значение заголовка Retry-After и CandleStreamDecoder
+                 (при потоковом декодировании успешного ответа) или тело ответа в байтах.
+        """
+        session = self._get_session()
+        started = asyncio.get_running_loop().time()
+        async with session.get(url, headers=self.headers) as response:
+            if (response.status != 200 or not self.stream_decoding
+                    or isinstance(self.decode_executor, ProcessPoolExecutor)):
+                body = await self._read(response, response.read, started)
+                return response.status, response.headers.get("Retry-After"), body
+            decoder = CandleStreamDecoder()
+
+            async def read_stream():
+                async for chunk in response.content.iter_chunked(settings.STREAM_CHUNK_SIZE):
+                    await self.decode(decoder.feed, chunk)
+
+            # Время чтения включает разбор порций, который идет вперемешку с получением.
+            await self._read(response, read_stream, started, streamed=True)
+            return response.status, None, decoder
+
+    # Асинхронный метод для чтения тела ответа с записью фаз и ошибок чтения в метрики.
+    async def _read(self, response: aiohttp.ClientResponse, read, started: float, streamed: bool = False):
+        """
+        Читает тело ответа. Trace-хуки aiohttp сообщают об ошибках только до получения
+        заголовков и о теле только при чтении через ClientResponse.read(), поэтому
+        ошибка чтения тела (таймаут, обрыв соединения) и окончание потокового чтения
+        записываются в instrumentation здесь.
+        :param response: Ответ сервера.
+        :param read: Корутинная функция без аргументов, читающая тело.
+        :param started: Время начала запроса по часам цикла событий.
+        :param streamed: Тело читается из response.content, а не через read()/text().
+        :return: Результат read.
+        """
+        if self.instrumentation is None:
+            return await read()
+        loop = asyncio.get_running_loop()
+        endpoint = f"{response.method} {response.url.path}"
+        headers_received = loop.time()
+        try:
+            result = await read()
+        except Exception:
+            finished = loop.time()
+            self.instrumentation.observe_body_error(endpoint, finished - headers_received, finished - started)
+            raise
+        if streamed:
+            finished = loop.time()
+            self.instrumentation.observe_body(endpoint, finished - headers_received, finished - started)
+        return result
+
+    # Асинхронный метод для отправки запроса через планировщик с сохранением HTTP-статуса.
+    async def _submit(self, group: str, send, idempotent: bool = True) -> tuple:
+        """
+        Отправляет запрос через планировщик, сохраняя HTTP-статус последней попытки.
+        :param group: Группа эндпоинтов для лимитов и приоритета (orders, account, data).
+        :param send: Корутинная функция без аргументов, возвращающая (HTTP-статус, Retry-After, ответ).
+        :param idempotent: Можно ли повторять запрос после ответа 5xx.
+        :return: HTTP-статус и ответ последней попытки.
+        """
+        async def send_with_status():
+            status, retry_after, result = await send()
+            return status, retry_after, (status, result)
+        return await self.scheduler.submit(group, send_with_status, idempotent)
+
+    # Асинхронный метод для запроса свечей с декодированием в колоночную серию.
+    async def _request_candles(self, url: str) -> CandleSeries:
+        status, result = await self._submit(GROUP_DATA, lambda: self._send_candles(url))
+        if isinstance(result, CandleStreamDecoder):
+            return await self.decode(result.finish)
+        check_response(status, result)
+        return await self.decode(CandleSeries.from_json, result)
+
+    # Асинхронный метод для декодирования ответа вне цикла событий.
+    async def decode(self, func, *args):
+        """
+        Выполняет декодирование в пуле decode_executor, а без пула - сразу в цикле событий.
+        Для пула процессов функция, аргументы и результат должны сериализоваться pickle.
+        :param func: Функция декодирования.
+        :param args: Аргументы функции.
+        :return: Результат func.
+        """
+        if self.decode_executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.decode_executor, func, *args)
+
+    # Метод для формирования URL запроса свечей.
+    def _candles_url(self, endpoint: str, security_board: str, security_code: str, time_frame: str,
+                     interval_from: str, interval_to: str, interval_count: int) -> str:
+        return (f"{self.base_url}/{endpoint}?SecurityBoard={security_board}&"
+                f"SecurityCode={security_code}&TimeFrame={time_frame}&Interval.From={interval_from}&"
+                f"Interval.To={interval_to}&Interval.Count={interval_count}")
 
     # Асинхронный метод для проверки токена доступа.
     async def check_access_token(self) -> str:
@@ -27,12 +251,8 @@ class TradeAPIClient:
         """
         # Формируем полный URL для запроса, добавляя к базовому URL путь к эндпоинту.
         url = f"{self.base_url}/access-tokens/check"
-        # Создаем асинхронную сессию запросов.
-        async with aiohttp.ClientSession() as session:
-            # Отправляем GET-запрос, используя сессию и указанные заголовки.
-            async with session.get(url, headers=self.headers) as response:
-                # Возвращаем текст ответа сервера.
-                return await response.text()
+        # Отправляем GET-запрос через общую сессию и возвращаем текст ответа сервера.
+        return await self._request("GET", url, GROUP_ACCOUNT)
     
     # Асинхронный метод для получения информации о дневных свечах.
     async def get_day_candles(
@@ -48,14 +268,10 @@ class TradeAPIClient:
         Принимает параметры запроса и возвращает ответ сервера с данными о свечах в текстовом формате.
         """
         # Формируем URL запроса, включая необходимые параметры как часть строки запроса (query string).
-        url = (f"{self.base_url}/day-candles?SecurityBoard={security_board}&"
-               f"SecurityCode={security_code}&TimeFrame={time_frame}&Interval.From={interval_from}&"
-               f"Interval.To={interval_to}&Interval.Count={interval_count}")
-        # Отправляем асинхронный GET-запрос с указанными параметрами и заголовками.
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers) as response:
-                # Возвращаем текстовый ответ сервера.
-                return await response.text()
+        url = self._candles_url("day-candles", security_board, security_code, time_frame,
+                                interval_from, interval_to, interval_count)
+        # Отправляем асинхронный GET-запрос и возвращаем текстовый ответ сервера.
+        return await self._request("GET", url)
 
     # Асинхронный метод для получения информации о внутридневных свечах.        
     async def get_intraday_candles(
@@ -77,12 +293,168 @@ class TradeAPIClient:
         :return: Ответ сервера с данными о свечах в текстовом формате.
         """
         # URL может потребовать изменения в зависимости от конечного API для интрадейных свечей
-        url = (f"{self.base_url}/intraday-candles?SecurityBoard={security_board}&"
-               f"SecurityCode={security_code}&TimeFrame={time_frame}&Interval.From={interval_from}&"
-               f"Interval.To={interval_to}&Interval.Count={interval_count}")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers) as response:
-                return await response.text()
+        url = self._candles_url("intraday-candles", security_board, security_code, time_frame,
+                                interval_from, interval_to, interval_count)
+        return await self._request("GET", url)
+
+    # Асинхронный метод для получения дневных свечей в виде колоночной серии.
+    async def get_day_candles_series(
+            self,
+            security_board: str,
+            security_code: str,
+            time_frame: str,
+            interval_from: str,
+            interval_to: str,
+            interval_count: int) -> CandleSeries:
+        """
+        Асинхронный запрос дневных свечей с декодированием в CandleSeries.
+        Параметры совпадают с get_day_candles.
+        Декодирование выполняется в decode_executor, если он задан, и по частям при stream_decoding.
+        :return: Серия свечей.
+        :raises TradeAPIError: Если сервер вернул ошибку или HTTP-статус не 2xx.
+        """
+        return await self._request_candles(self._candles_url(
+            "day-candles", security_board, security_code, time_frame, interval_from, interval_to, interval_count))
+
+    # Асинхронный метод для получения интрадейных свечей в виде колоночной серии.
+    async def get_intraday_candles_series(
+            self,
+            security_board: str,
+            security_code: str,
+            time_frame: str,
+            interval_from: str,
+            interval_to: str,
+            interval_count: int) -> CandleSeries:
+        """
+        Асинхронный запрос интрадейных свечей с декодированием в CandleSeries.
+        Параметры совпадают с get_intraday_candles.
+        Декодирование выполняется в decode_executor, если он задан, и по частям при stream_decoding.
+        :return: Серия свечей.
+        :raises TradeAPIError: Если сервер вернул ошибку или HTTP-статус не 2xx.
+        """
+        return await self._request_candles(self._candles_url(
+            "intraday-candles", security_board, security_code, time_frame, interval_from, interval_to, interval_count))
+
+    # Асинхронный генератор для загрузки длинной истории интрадейных свечей.
+    async def backfill_intraday_candles(
+            self,
+            security_board: str,
+            security_code: str,
+            time_frame: str,
+            interval_from,
+            interval_to,
+            concurrency: int = settings.BACKFILL_CONCURRENCY,
+            max_candles: int = settings.INTRADAY_MAX_CANDLES):
+        """
+        Загружает историю интрадейных свечей за длинный период.
+        Интервал разбивается на окна, которые сервер отдает за один запрос,
+        окна загружаются конкурентно (не более concurrency одновременно),
+        а результат отдается по мере готовности в хронологическом порядке.
+        Свечи, повторяющиеся на границах окон, отбрасываются.
+        :param security_board: Режим торгов.
+        :param security_code: Тикер инструмента.
+        :param time_frame: Временной интервал (format:M1;M5;M15;M30;H1;H4).
+        :param interval_from: Начало периода (datetime или yyyy-mm-ddTHH:MM:SS).
+        :param interval_to: Конец периода (datetime или yyyy-mm-ddTHH:MM:SS).
+        :param concurrency: Максимум одновременно загружаемых окон.
+        :param max_candles: Максимум свечей, которые сервер отдает за один запрос.
+        :return: Асинхронный генератор непустых серий свечей по окнам.
+        """
+        step = timedelta(minutes=TIME_FRAME_MINUTES[time_frame] * max_candles)
+        windows = iter(split_interval(parse_time(interval_from), parse_time(interval_to), step))
+        pending = deque()
+
+        # Ставит в очередь загрузку следующего окна, если окна еще остались.
+        def schedule_next():
+            window = next(windows, None)
+            if window is not None:
+                pending.append(asyncio.ensure_future(self.get_intraday_candles_series(
+                    security_board, security_code, time_frame,
+                    format_time(window[0]), format_time(window[1]), max_candles)))
+
+        for _ in range(max(1, concurrency)):
+            schedule_next()
+        last_timestamp = None
+        try:
+            while pending:
+                series = await pending.popleft()
+                schedule_next()
+                if last_timestamp is not None:
+                    series = series.between(start=last_timestamp + 1)
+                if len(series):
+                    last_timestamp = int(series.timestamps[-1])
+                    yield series
+        finally:
+            # При досрочной остановке генератора отменяем незавершенные загрузки.
+            for task in pending:
+                task.cancel()
+
+    # Асинхронный метод для загрузки длинной истории интрадейных свечей одной серией.
+    async def get_intraday_candles_history(
+            self,
+            security_board: str,
+            security_code: str,
+            time_frame: str,
+            interval_from,
+            interval_to,
+            concurrency: int = settings.BACKFILL_CONCURRENCY) -> CandleSeries:
+        """
+        Загружает историю интрадейных свечей и склеивает окна в одну серию.
+        Параметры совпадают с backfill_intraday_candles.
+        :return: Серия свечей за весь период.
+        """
+        windows = [series async for series in self.backfill_intraday_candles(
+            security_board, security_code, time_frame, interval_from, interval_to, concurrency)]
+        return CandleSeries.concat(windows)
+
+    # Асинхронный метод для получения свечей через локальное хранилище.
+    async def get_candles_cached(
+            self,
+            security_board: str,
+            security_code: str,
+            time_frame: str,
+            interval_from,
+            interval_to) -> CandleSeries:
+        """
+        Возвращает свечи за период, загружая с сервера только отсутствующие в хранилище части.
+        Загруженные части дописываются в хранилище, результат читается из него без копирования.
+        Текущая незавершенная свеча в хранилище не сохраняется.
+        :param security_board: Режим торгов.
+        :param security_code: Тикер инструмента.
+        :param time_frame: Таймфрейм (format:M1;M5;M15;M30;H1;H4;D1).
+        :param interval_from: Начало периода (datetime или yyyy-mm-dd[THH:MM:SS]).
+        :param interval_to: Конец периода (datetime или yyyy-mm-dd[THH:MM:SS]), не включается.
+        :return: Серия свечей.
+        :raises ValueError: Если клиенту не передано хранилище свечей.
+        """
+        if self.candle_store is None:
+            raise ValueError("Хранилище свечей не задано: передайте candle_store в TradeAPIClient")
+        is_day = time_frame in DAY_TIME_FRAME_MINUTES
+        step = 60 * (DAY_TIME_FRAME_MINUTES[time_frame] if is_day else TIME_FRAME_MINUTES[time_frame])
+        start = to_timestamp(interval_from)
+        end = to_timestamp(interval_to)
+        # Кэшируем только завершенные свечи: граница не позже начала текущей свечи.
+        now = to_timestamp(datetime.now(timezone.utc))
+        cache_end = min(end, now - now % step)
+        for gap_start, gap_end in self.candle_store.missing(
+                security_board, security_code, time_frame, start, cache_end):
+            if is_day:
+                # Сервер ограничивает число свечей в ответе, поэтому длинный пропуск загружается
+                # окнами, которые он отдает целиком, и каждое окно отмечается покрытым отдельно.
+                for window_start, window_end in split_interval(
+                        from_timestamp(gap_start), from_timestamp(gap_end),
+                        timedelta(days=settings.DAY_MAX_CANDLES)):
+                    series = await self.get_day_candles_series(
+                        security_board, security_code, time_frame,
+                        window_start.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d"), 0)
+                    self.candle_store.write(security_board, security_code, time_frame, series,
+                                            to_timestamp(window_start), to_timestamp(window_end))
+            else:
+                series = await self.get_intraday_candles_history(
+                    security_board, security_code, time_frame,
+                    from_timestamp(gap_start), from_timestamp(gap_end))
+                self.candle_store.write(security_board, security_code, time_frame, series, gap_start, gap_end)
+        return self.candle_store.read(security_board, security_code, time_frame, start, end)
             
     # Асинхронный метод для получения информации о портфеле  
     async def get_portfolio(
@@ -102,24 +474,48 @@ class TradeAPIClient:
                f"Content.IncludeMoney={str(include_money).lower()}&"
                f"Content.IncludePositions={str(include_positions).lower()}&"
                f"Content.IncludeMaxBuySell={str(include_max_buy_sell).lower()}")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers) as response:
-                return await response.text()
+        return await self._request("GET", url, GROUP_ACCOUNT)
     
     # Асинхронный метод для получения информации об инструментах          
-    async def get_securities(self, board, seccode) -> str:
+    async def get_securities(self, board=None, seccode=None) -> str:
         """
         Асинхронный запрос информации об инструментах.
+        Без параметров сервер возвращает весь справочник инструментов.
 
         :param board: Режим торговой площадки.
         :param seccode: Код ценной бумаги.
         :return: Ответ сервера с данными о запрошенных инструментах в текстовом формате.
         """
-        url = f"{self.base_url}/securities?Board={board}&Seccode={seccode}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers) as response:
-                return await response.text()
+        url = f"{self.base_url}/securities"
+        params = {}
+        if board is not None:
+            params["Board"] = board
+        if seccode is not None:
+            params["Seccode"] = seccode
+        return await self._request("GET", url, params=params)
     
+    # Асинхронный метод для получения параметров одного инструмента.
+    async def get_security(self, board: str, seccode: str) -> Security:
+        """
+        Асинхронный запрос параметров инструмента с декодированием в Security.
+
+        :param board: Режим торговой площадки.
+        :param seccode: Код ценной бумаги.
+        :return: Параметры инструмента.
+        :raises LookupError: Если сервер не вернул такой инструмент.
+        :raises TradeAPIError: Если сервер вернул ошибку или HTTP-статус не 2xx.
+        """
+        url = f"{self.base_url}/securities"
+        params = {"Board": board, "Seccode": seccode}
+        status, text = await self._submit(GROUP_DATA, lambda: self._send("GET", url, params=params))
+        check_response(status, text)
+        data = await self.decode(unwrap_response, text)
+        for item in data.get("securities") or []:
+            security = Security.from_dict(item)
+            if (security.board, security.code) == (board, seccode):
+                return security
+        raise LookupError(f"Инструмент {board}:{seccode} не найден")
+
     # Асинхронный метод для размещения ордера
     async def place_order(self, order_data: dict) -> str:
         """
@@ -129,12 +525,9 @@ class TradeAPIClient:
         :return: Ответ сервера на запрос о размещении ордера.
         """
         url = f"{self.base_url}/orders"
-        async with aiohttp.ClientSession() as session:
-            # Используем параметр json= для автоматической сериализации и установки нужного Content-Type
-            async with session.post(url, headers=self.headers, 
-                                    json=order_data,   # Изменено с data на json
-                                    ssl=False) as response:  # SSL-проверка отключена для упрощения примера
-                return await response.text()
+        # Используем параметр json= для автоматической сериализации и установки нужного Content-Type.
+        # Проверка SSL настраивается параметром verify_ssl клиента.
+        return await self._request("POST", url, GROUP_ORDERS, json=order_data)
 
     # Асинхронный метод для получения информации об ордерах   
     async def get_orders(self, client_id: str, include_matched: bool, include_canceled: bool, include_active: bool) -> str:
@@ -155,9 +548,7 @@ class TradeAPIClient:
             "IncludeCanceled": str(include_canceled).lower(),
             "IncludeActive": str(include_active).lower()
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers, params=params) as response:
-                return await response.text()
+        return await self._request("GET", url, GROUP_ACCOUNT, params=params)
     
     # Асинхронный метод для снятия ордера по транзакции           
     async def cancel_order(self, client_id: str, transaction_id: int) -> str:
@@ -168,7 +559,85 @@ class TradeAPIClient:
         :param transaction_id: Идентификатор транзакции ордера, который нужно отменить.
         :return: Ответ сервера на запрос об отмене ордера.
         """
-        url = f"{self.base_url}/orders?ClientId={client_id}&TransactionId={transaction_id}"
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url, headers=self.headers) as response:
-                return await response.text()
\ No newline at end of file
+        url = f"{self.base_url}/orders"
+        params = {"ClientId": client_id, "TransactionId": str(transaction_id)}
+        return await self._request("DELETE", url, GROUP_ORDERS, params=params)
+
+    # Асинхронный генератор для пакетного запроса по списку инструментов.
+    def iter_batch(self, symbols: list, fetch, concurrency: int = settings.BATCH_CONCURRENCY):
+        """
+        Выполняет запрос по каждому инструменту с ограниченной конкурентностью
+        и отдает результаты по мере завершения. Ошибка по одному инструменту
+        не прерывает остальные запросы.
+        :param symbols: Список пар (режим торгов, код инструмента).
+        :param fetch: Корутинная функция fetch(board, code), выполняющая запрос.
+        :param concurrency: Максимум одновременных запросов.
+        :return: Асинхронный генератор SymbolResult в порядке завершения.
+        """
+        return iter_batch(symbols, fetch, concurrency)
+
+    # Асинхронный метод для пакетного запроса по списку инструментов.
+    async def batch(self, symbols: list, fetch, concurrency: int = settings.BATCH_CONCURRENCY) -> BatchResult:
+        """
+        Выполняет запрос по каждому инструменту и собирает результаты.
+        Параметры совпадают с iter_batch.
+        :return: Результаты, ошибки и время запросов по инструментам.
+        """
+        return await collect(self.iter_batch(symbols, fetch, concurrency))
+
+    # Асинхронный генератор для пакетного запроса дневных свечей.
+    def iter_day_candles_batch(
+            self,
+            symbols: list,
+            time_frame: str,
+            interval_from: str,
+            interval_to: str,
+            interval_count: int,
+            concurrency: int = settings.BATCH_CONCURRENCY):
+        """
+        Запрашивает дневные свечи по списку инструментов и отдает серии по мере готовности.
+        :param symbols: Список пар (режим торгов, код инструмента).
+        :param concurrency: Максимум одновременных запросов.
+        Остальные параметры совпадают с get_day_candles.
+        :return: Асинхронный генератор SymbolResult со значениями CandleSeries.
+        """
+        async def fetch(board, code):
+            return await self.get_day_candles_series(
+                board, code, time_frame, interval_from, interval_to, interval_count)
+        return self.iter_batch(symbols, fetch, concurrency)
+
+    # Асинхронный метод для пакетного запроса дневных свечей.
+    async def get_day_candles_batch(
+            self,
+            symbols: list,
+            time_frame: str,
+            interval_from: str,
+            interval_to: str,
+            interval_count: int,
+            concurrency: int = settings.BATCH_CONCURRENCY) -> BatchResult:
+        """
+        Запрашивает дневные свечи по списку инструментов.
+        Параметры совпадают с iter_day_candles_batch.
+        :return: Результаты со значениями CandleSeries, ошибки и время запросов.
+        """
+        return await collect(self.iter_day_candles_batch(
+            symbols, time_frame, interval_from, interval_to, interval_count, concurrency))
+
+    # Асинхронный генератор для пакетного запроса информации об инструментах.
+    def iter_securities_batch(self, symbols: list, concurrency: int = settings.BATCH_CONCURRENCY):
+        """
+        Запрашивает информацию об инструментах и отдает ее по мере готовности.
+        :param symbols: Список пар (режим торгов, код инструмента).
+        :param concurrency: Максимум одновременных запросов.
+        :return: Асинхронный генератор SymbolResult со значениями Security.
+        """
+        return self.iter_batch(symbols, self.get_security, concurrency)
+
+    # Асинхронный метод для пакетного запроса информации об инструментах.
+    async def get_securities_batch(self, symbols: list, concurrency: int = settings.BATCH_CONCURRENCY) -> BatchResult:
+        """
+        Запрашивает информацию об инструментах по списку.
+        Параметры совпадают с iter_securities_batch.
+        :return: Результаты со значениями Security, ошибки и время запросов.
+        """
+        return await collect(self.iter_securities_batch(symbols, concurrency))
@@ -0,0 +1,89 @@
+"""
+Потоковое декодирование ответов приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import re
+
+from app.models import CandleSeries, unwrap_response
+from app.utils import json_loads
+
+
+# Начало массива свечей в ответе /day-candles и /intraday-candles.
+CANDLES_START = re.compile(rb'"candles"\s*:\s*\[')
+
+# Одна свеча: объект с одним уровнем вложенных объектов цен {"num", "scale"}.
+CANDLE_OBJECT = re.compile(rb'\s*,?\s*(\{(?:[^{}"]|"[^"]*"|\{(?:[^{}"]|"[^"]*")*\})*\})')
+
+# Конец массива свечей.
+CANDLES_END = re.compile(rb'\s*\]')
+
+# Состояния декодера относительно массива свечей.
+BEFORE_CANDLES = 0
+IN_CANDLES = 1
+AFTER_CANDLES = 2
+
+
+# Потоковый декодер ответа со свечами.
+class CandleStreamDecoder:
+    """
+    Декодирует ответ со свечами по частям, не собирая тело ответа целиком.
+    Из каждой порции байтов извлекаются завершенные объекты свечей и сразу
+    переводятся в колонки; незавершенный хвост ждет следующей порции.
+    Все, что находится вне массива свечей, сохраняется, чтобы в конце
+    проверить ответ на ошибку сервера.
+    """
+
+    def __init__(self):
+        self._state = BEFORE_CANDLES
+        self._buffer = b""
+        self._skeleton = []
+        self._chunks = []
+
+    # Метод для передачи очередной порции тела ответа.
+    def feed(self, data: bytes):
+        """
+        Обрабатывает очередную порцию тела ответа.
+        :param data: Байты тела ответа.
+        """
+        self._buffer += data
+        if self._state == BEFORE_CANDLES:
+            match = CANDLES_START.search(self._buffer)
+            if match is None:
+                return
+            self._skeleton.append(self._buffer[:match.end()])
+            self._buffer = self._buffer[match.end():]
+            self._state = IN_CANDLES
+        if self._state == IN_CANDLES:
+            candles = []
+            position = 0
+            match = CANDLE_OBJECT.match(self._buffer, position)
+            while match is not None:
+                candles.append(match.group(1))
+                position = match.end()
+                match = CANDLE_OBJECT.match(self._buffer, position)
+            end = CANDLES_END.match(self._buffer, position)
+            if end is not None:
+                self._skeleton.append(b"]")
+                position = end.end()
+                self._state = AFTER_CANDLES
+            self._buffer = self._buffer[position:]
+            if candles:
+                self._chunks.append(CandleSeries.from_candles(json_loads(b"[" + b",".join(candles) + b"]")))
+        if self._state == AFTER_CANDLES:
+            self._skeleton.append(self._buffer)
+            self._buffer = b""
+
+    # Метод для завершения декодирования.
+    def finish(self) -> CandleSeries:
+        """
+        Завершает декодирование после получения всего тела ответа.
+        :return: Серия свечей.
+        :raises TradeAPIError: Если сервер вернул ошибку.
+        :raises ValueError: Если ответ оборван внутри массива свечей или имеет неожиданный формат.
+        """
+        if self._state == IN_CANDLES:
+            raise ValueError("Ответ со свечами оборван или имеет неожиданный формат")
+        skeleton = self._buffer if self._state == BEFORE_CANDLES else b"".join(self._skeleton)
+        unwrap_response(skeleton)
+        return CandleSeries.concat(self._chunks)
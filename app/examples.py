@@ -6,6 +6,14 @@
 Репозиторий https://github.com/sdkinfotech/async-finam-rest-api-client.git
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.orders import PRICE, QUANTITY, OrderEntry, OrderTemplate
+from app.securities import SecuritiesIndex
+from app.tracker import OrderTracker
+from app.utils import resample_candles
+
 # Асинхронная функция для проверки токена доступа.
 async def check_token(client):
     """
@@ -53,6 +61,130 @@ async def fetch_intraday_candles(client):
     )
     print(f"Информация о интрадейных свечах: {intraday_candles_info}")
 
+# Асинхронная функция для запроса интрадейных свечей в виде колоночной серии.
+async def fetch_intraday_candles_series(client):
+    """
+    Запрос интрадейных свечей с декодированием в CandleSeries.
+    Аргументы:
+    - client: экземпляр клиента API для отправки запроса.
+    Выводит в консоль количество свечей и первую свечу серии.
+    """
+    series = await client.get_intraday_candles_series(
+        security_board="TQBR",
+        security_code="SBER",
+        time_frame="M1",
+        interval_from="2024-03-01T09:00:00",
+        interval_to="2024-03-01T18:00:00",
+        interval_count=0
+    )
+    print(f"Получено интрадейных свечей: {len(series)}")
+    if len(series):
+        print(f"Первая свеча: {series[0]}")
+
+# Асинхронная функция для запроса свечей с потоковым декодированием в пуле потоков.
+async def fetch_candles_streaming(client):
+    """
+    Запрос минутных свечей с декодированием по мере получения ответа.
+    Разбор каждой порции выполняется в пуле потоков, поэтому цикл событий
+    не блокируется на больших ответах.
+    Аргументы:
+    - client: экземпляр клиента API для отправки запроса.
+    Выводит в консоль количество свечей серии.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        client.decode_executor = executor
+        client.stream_decoding = True
+        try:
+            series = await client.get_intraday_candles_series(
+                security_board="TQBR",
+                security_code="SBER",
+                time_frame="M1",
+                interval_from="2024-03-01T09:00:00",
+                interval_to="2024-03-01T18:00:00",
+                interval_count=0
+            )
+        finally:
+            client.decode_executor = None
+            client.stream_decoding = False
+    print(f"Получено интрадейных свечей: {len(series)}")
+
+# Асинхронная функция для построения старших таймфреймов из минутных свечей.
+async def resample_intraday_candles(client):
+    """
+    Один запрос минутных свечей вместо отдельных запросов M15, H1 и D1:
+    старшие таймфреймы строятся локально с учетом торговых сессий.
+    Аргументы:
+    - client: экземпляр клиента API для отправки запроса.
+    Выводит в консоль количество свечей каждого таймфрейма.
+    """
+    minute_candles = await client.get_intraday_candles_series(
+        security_board="TQBR",
+        security_code="SBER",
+        time_frame="M1",
+        interval_from="2024-03-01T00:00:00",
+        interval_to="2024-03-02T00:00:00",
+        interval_count=0
+    )
+    for time_frame in ("M15", "H1", "D1"):
+        print(f"{time_frame}: {len(resample_candles(minute_candles, time_frame))} свечей")
+
+# Асинхронная функция для загрузки длинной истории интрадейных свечей.
+async def backfill_intraday_candles(client):
+    """
+    Загрузка месяца минутных свечей окнами с ограниченной конкурентностью.
+    Аргументы:
+    - client: экземпляр клиента API для отправки запросов.
+    Выводит в консоль размер каждого загруженного окна.
+    """
+    async for series in client.backfill_intraday_candles(
+        security_board="TQBR",
+        security_code="SBER",
+        time_frame="M1",
+        interval_from="2024-03-01T00:00:00",
+        interval_to="2024-04-01T00:00:00",
+        concurrency=4
+    ):
+        print(f"Загружено окно: {len(series)} свечей, последняя {series[-1].timestamp}")
+
+# Асинхронная функция для запроса свечей через локальное хранилище.
+async def fetch_cached_candles(client):
+    """
+    Запрос дневных свечей через локальное хранилище CandleStore.
+    При повторном запуске свечи читаются с диска без обращения к серверу.
+    Аргументы:
+    - client: экземпляр клиента API, созданный с параметром candle_store.
+    Выводит в консоль количество свечей в серии.
+    """
+    series = await client.get_candles_cached(
+        security_board="TQBR",
+        security_code="GAZP",
+        time_frame="D1",
+        interval_from="2024-01-01",
+        interval_to="2024-04-01"
+    )
+    print(f"Свечей в хранилище за период: {len(series)}")
+
+# Асинхронная функция для пакетного запроса дневных свечей по списку инструментов.
+async def fetch_day_candles_batch(client):
+    """
+    Запрос дневных свечей по нескольким инструментам с обработкой результатов по мере готовности.
+    Аргументы:
+    - client: экземпляр клиента API, используемый для выполнения запросов.
+    Выводит в консоль результат или ошибку по каждому инструменту.
+    """
+    symbols = [("TQBR", "SBER"), ("TQBR", "GAZP"), ("TQBR", "LKOH"), ("TQBR", "VTBR")]
+    async for result in client.iter_day_candles_batch(
+        symbols,
+        time_frame="D1",
+        interval_from="2024-03-01",
+        interval_to="2024-03-21",
+        interval_count=0
+    ):
+        if result.ok:
+            print(f"{result.code}: {len(result.value)} свечей за {result.elapsed:.3f} с")
+        else:
+            print(f"{result.code}: ошибка {result.error!r}")
+
 # Асинхронная функция для запроса информации о портфеле TRANSAQ
 async def fetch_portfolio(client, client_id):
     """
@@ -76,6 +208,18 @@ async def fetch_securities(client, board="TQBR", seccode="GAZP"):
     securities_info = await client.get_securities(board=board, seccode=seccode)
     print(f"Информация о ценных бумагах: {securities_info}")
 
+# Асинхронная функция для поиска инструментов в справочнике в памяти.
+async def lookup_securities(client):
+    """
+    Загрузка справочника инструментов и поиск параметров для подготовки ордера.
+    
+    :param client: Экземпляр клиента API, используемый для выполнения запроса.
+    """
+    async with SecuritiesIndex(client) as securities:
+        security = await securities.lookup("TQBR", "SBER")
+        print(f"Инструментов в справочнике: {len(securities)}")
+        print(f"Лот: {security.lot_size}, шаг цены: {security.price_step}, знаков: {security.decimals}")
+
 # Асинхронная функция для размещения ордера
 async def place_order(client, client_id):
     """
@@ -107,6 +251,31 @@ async def place_order(client, client_id):
     order_response = await client.place_order(order_data)
     print("Ответ на размещение ордера:", order_response)
 
+# Асинхронная функция для размещения ордеров через выделенный канал
+async def place_orders_fast(client, client_id):
+    """
+    Размещение ордеров по заранее сериализованному шаблону через канал OrderEntry
+    с прогретыми соединениями и замером задержки.
+    :param client: Экземпляр клиента API, используемый для выполнения запроса.
+    :param client_id: ключ API в данном случае TRANSAQ_TOKEN
+    """
+    template = OrderTemplate({
+        "clientId": client_id,
+        "securityBoard": "TQBR",
+        "securityCode": "VTBR",
+        "buySell": "Buy",
+        "quantity": QUANTITY,
+        "useCredit": False,
+        "price": PRICE,
+        "property": "PutInQueue",
+        "condition": None,
+        "validBefore": {"type": "TillEndSession", "time": None}
+    })
+    async with OrderEntry(client) as orders:
+        responses = await orders.place_many([(template, 0.012485, 1), (template, 0.012480, 1)])
+        print("Ответы на размещение ордеров:", responses)
+        print("Задержка от отправки до ответа:", orders.latency_stats())
+
 async def get_orders(client, client_id):
     """
     Асинхронная функция для получения списка ордеров.
@@ -125,6 +294,29 @@ async def get_orders(client, client_id):
     
     print("Ответ на запрос списка ордеров:", orders_response)
 
+# Асинхронная функция для отслеживания изменений ордеров
+async def track_orders(client, client_id, duration=60):
+    """
+    Асинхронная функция, демонстрирующая поток изменений ордеров
+    (новые, частично исполненные, исполненные и снятые).
+
+    :param client: Экземпляр клиента API, используемый для выполнения запроса.
+    :param client_id: Идентификатор клиента.
+    :param duration: Длительность отслеживания в секундах.
+    """
+    async with OrderTracker(client, client_id) as tracker:
+        print(f"Активных ордеров: {len(tracker.active())}")
+
+        async def print_events():
+            async for event in tracker.events():
+                print(f"{event.kind}: транзакция {event.order.transaction_id}, "
+                      f"исполнено {event.order.filled} из {event.order.quantity}")
+
+        try:
+            await asyncio.wait_for(print_events(), duration)
+        except asyncio.TimeoutError:
+            pass
+
 # Асинхронная функция для снятия ордера
 async def delete_order(client, client_id):
     """
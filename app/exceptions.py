@@ -0,0 +1,22 @@
+"""
+Модуль исключений приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+
+# Исключение для ошибок, которые вернул сервер Trade API.
+class TradeAPIError(Exception):
+    """
+    Ошибка, полученная в ответе Trade API.
+    :param code: Код ошибки сервера.
+    :param message: Текст ошибки сервера.
+    """
+
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+    # Сохранение аргументов конструктора при передаче исключения между процессами.
+    def __reduce__(self):
+        return self.__class__, (self.code, self.message)
@@ -0,0 +1,305 @@
+"""
+Инструментирование запросов приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+from bisect import bisect_left
+
+import aiohttp
+
+
+# Границы корзин гистограмм задержек, секунды.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+# Фазы запроса, для которых строятся гистограммы:
+# queue - ожидание свободного соединения в пуле, dns - разрешение имени,
+# connect - установка соединения вместе с TLS (aiohttp не разделяет эти фазы),
+# ttfb - от начала запроса до получения заголовков ответа,
+# body - чтение тела ответа, total - от начала запроса до прочтения тела.
+PHASES = ("queue", "dns", "connect", "ttfb", "body", "total")
+
+
+# Гистограмма с фиксированными корзинами.
+class Histogram:
+    """
+    Гистограмма значений с фиксированными границами корзин.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    # Метод для добавления значения.
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Метод для оценки квантиля по корзинам.
+    def quantile(self, q: float) -> float:
+        """
+        Возвращает верхнюю границу корзины, в которую попадает квантиль q.
+        :param q: Квантиль от 0 до 1.
+        :return: Оценка квантиля в секундах (0, если значений нет).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return self.buckets[-1]
+
+    # Метод для получения состояния гистограммы.
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": buckets,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+# Метрики одного эндпоинта.
+class EndpointStats:
+    """
+    Счетчики запросов и ошибок, число запросов, ожидающих заголовков ответа,
+    и гистограммы фаз эндпоинта.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.phases = {phase: Histogram() for phase in PHASES}
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "phases": {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+        }
+
+
+# Сбор метрик запросов через trace-хуки aiohttp.
+class Instrumentation:
+    """
+    Собирает по каждому эндпоинту (метод и путь) количество запросов и ошибок,
+    число запросов, ожидающих заголовков ответа (in_flight; чтение тела в него
+    не входит и видно в фазе body), и гистограммы задержек по фазам запроса.
+    Подключается к клиенту параметром instrumentation конструктора TradeAPIClient.
+    Ошибкой считается исключение при запросе или чтении тела ответа и HTTP-статус 400 и выше.
+    """
+
+    def __init__(self, exporters: list = None):
+        """
+        Инициализация сбора метрик.
+        :param exporters: Экспортеры, которым метод export() передает снимок метрик.
+        """
+        self.exporters = list(exporters or [])
+        self.endpoints = {}
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_connection_queued_start.append(self._on_queued_start)
+        self.trace_config.on_connection_queued_end.append(self._on_queued_end)
+        self.trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        self.trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        self.trace_config.on_connection_create_start.append(self._on_connect_start)
+        self.trace_config.on_connection_create_end.append(self._on_connect_end)
+        self.trace_config.on_request_end.append(self._on_request_end)
+        self.trace_config.on_request_exception.append(self._on_request_exception)
+        self.trace_config.on_response_chunk_received.append(self._on_response_chunk)
+
+    # Метрики эндпоинта, создаются при первом запросе.
+    def _stats(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.started = self._now()
+        ctx.stats = self._stats(f"{params.method} {params.url.path}")
+        ctx.stats.requests += 1
+        ctx.stats.in_flight += 1
+
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued = self._now()
+
+    async def _on_queued_end(self, session, ctx, params):
+        ctx.stats.phases["queue"].observe(self._now() - ctx.queued)
+
+    async def _on_dns_start(self, session, ctx, params):
+        ctx.dns_started = self._now()
+
+    async def _on_dns_end(self, session, ctx, params):
+        ctx.stats.phases["dns"].observe(self._now() - ctx.dns_started)
+
+    async def _on_connect_start(self, session, ctx, params):
+        ctx.connect_started = self._now()
+
+    async def _on_connect_end(self, session, ctx, params):
+        ctx.stats.phases["connect"].observe(self._now() - ctx.connect_started)
+
+    async def _on_request_end(self, session, ctx, params):
+        ctx.headers_received = self._now()
+        ctx.stats.in_flight -= 1
+        ctx.stats.phases["ttfb"].observe(ctx.headers_received - ctx.started)
+        if params.response.status >= 400:
+            ctx.stats.errors += 1
+
+    async def _on_request_exception(self, session, ctx, params):
+        ctx.stats.in_flight -= 1
+        ctx.stats.errors += 1
+
+    async def _on_response_chunk(self, session, ctx, params):
+        # aiohttp сообщает о теле ответа один раз, после его полного прочтения через read().
+        # Тело, прочитанное потоком из response.content, и ошибки чтения тела записывает
+        # клиент через observe_body и observe_body_error.
+        now = self._now()
+        ctx.stats.phases["body"].observe(now - ctx.headers_received)
+        ctx.stats.phases["total"].observe(now - ctx.started)
+
+    # Метод для записи времени чтения тела ответа, прочитанного потоком.
+    def observe_body(self, endpoint: str, body: float, total: float):
+        """
+        Записывает фазы body и total запроса, тело которого прочитано из response.content
+        без ClientResponse.read(): для такого чтения aiohttp не вызывает on_response_chunk_received.
+        :param endpoint: Эндпоинт в формате "МЕТОД путь".
+        :param body: Время от получения заголовков до прочтения тела в секундах.
+        :param total: Время от начала запроса до прочтения тела в секундах.
+        """
+        stats = self._stats(endpoint)
+        stats.phases["body"].observe(body)
+        stats.phases["total"].observe(total)
+
+    # Метод для записи ошибки чтения тела ответа.
+    def observe_body_error(self, endpoint: str, body: float, total: float):
+        """
+        Записывает ошибку, возникшую при чтении тела ответа (таймаут, обрыв соединения):
+        on_request_exception aiohttp вызывает только до получения заголовков.
+        Фазы body и total записываются по моменту ошибки.
+        :param endpoint: Эндпоинт в формате "МЕТОД путь".
+        :param body: Время от получения заголовков до ошибки в секундах.
+        :param total: Время от начала запроса до ошибки в секундах.
+        """
+        stats = self._stats(endpoint)
+        stats.errors += 1
+        stats.phases["body"].observe(body)
+        stats.phases["total"].observe(total)
+
+    # Метод для получения снимка метрик.
+    def snapshot(self) -> dict:
+        """
+        Возвращает снимок метрик по эндпоинтам:
+        {эндпоинт: {"requests", "errors", "in_flight", "phases": {фаза: гистограмма}}}.
+        """
+        return {endpoint: stats.snapshot() for endpoint, stats in self.endpoints.items()}
+
+    # Метод для передачи метрик экспортерам.
+    def export(self):
+        """
+        Передает текущий снимок метрик всем экспортерам.
+        """
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter.export(snapshot)
+
+
+# Базовый класс экспортера метрик.
+class MetricsExporter:
+    """
+    Интерфейс экспортера: получает снимок метрик Instrumentation.snapshot().
+    """
+
+    def export(self, snapshot: dict):
+        raise NotImplementedError
+
+
+# Экспортер, хранящий последний снимок в памяти процесса.
+class SnapshotExporter(MetricsExporter):
+    """
+    Сохраняет последний переданный снимок метрик в атрибуте last.
+    """
+
+    def __init__(self):
+        self.last = {}
+
+    def export(self, snapshot: dict):
+        self.last = snapshot
+
+
+# Экспортер в текстовый формат Prometheus.
+class PrometheusExporter(MetricsExporter):
+    """
+    Переводит снимок метрик в текстовый формат Prometheus.
+    Последний результат хранится в атрибуте text, а если задан path - пишется в файл
+    (например, для textfile collector в node_exporter).
+    """
+
+    def __init__(self, prefix: str = "finam_client", path: str = None):
+        """
+        Инициализация экспортера.
+        :param prefix: Префикс имен метрик.
+        :param path: Путь к файлу, в который записываются метрики.
+        """
+        self.prefix = prefix
+        self.path = path
+        self.text = ""
+
+    def export(self, snapshot: dict):
+        self.text = self.render(snapshot)
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(self.text)
+
+    # Экранирование значения метки.
+    @staticmethod
+    def _label(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    # Метод для перевода снимка в текстовый формат Prometheus.
+    def render(self, snapshot: dict) -> str:
+        """
+        Переводит снимок метрик в текстовый формат Prometheus.
+        :param snapshot: Снимок Instrumentation.snapshot().
+        :return: Текст метрик.
+        """
+        prefix = self.prefix
+        lines = []
+        for name, kind, field, description in (
+                ("requests_total", "counter", "requests", "Количество запросов"),
+                ("errors_total", "counter", "errors", "Количество ошибок"),
+                ("in_flight", "gauge", "in_flight", "Запросы, ожидающие заголовков ответа")):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for endpoint, stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{endpoint="{self._label(endpoint)}"}} {stats[field]}')
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} Длительность фаз запроса")
+        lines.append(f"# TYPE {name} histogram")
+        for endpoint, stats in snapshot.items():
+            for phase, histogram in stats["phases"].items():
+                labels = f'endpoint="{self._label(endpoint)}",phase="{phase}"'
+                for bound, count in histogram["buckets"]:
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram['sum']}")
+                lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+        return "\n".join(lines) + "\n"
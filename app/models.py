@@ -0,0 +1,359 @@
+"""
+Модели данных приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import numpy as np
+
+from app.exceptions import TradeAPIError
+from app.utils import json_loads
+
+
+# Поля цен свечи в ответе сервера, каждое в формате {"num": int, "scale": int}.
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+# Функция для проверки ответа сервера на наличие ошибки.
+def unwrap_response(payload) -> dict:
+    """
+    Разбирает JSON-ответ Trade API и возвращает содержимое поля data.
+    :param payload: Текст, байты или уже разобранный ответ сервера.
+    :return: Словарь с данными ответа.
+    :raises TradeAPIError: Если сервер вернул ошибку.
+    """
+    response = json_loads(payload) if isinstance(payload, (str, bytes)) else payload
+    error = response.get("error")
+    if error:
+        raise TradeAPIError(error.get("code"), error.get("message"))
+    return response.get("data") or {}
+
+
+# Максимальная длина тела ответа в тексте ошибки HTTP.
+ERROR_BODY_LIMIT = 500
+
+
+# Функция для проверки HTTP-статуса ответа сервера.
+def check_response(status: int, payload):
+    """
+    Проверяет HTTP-статус ответа до его декодирования.
+    Для ответа с ошибкой в формате Trade API поднимается ошибка сервера, для остальных
+    (например, страницы шлюза при 5xx) - ошибка с HTTP-статусом в качестве кода.
+    :param status: HTTP-статус ответа.
+    :param payload: Текст или байты ответа сервера.
+    :raises TradeAPIError: Если статус ответа не 2xx.
+    """
+    if 200 <= status < 300:
+        return
+    try:
+        unwrap_response(payload)
+    except (ValueError, AttributeError):
+        # Тело ответа не в формате Trade API.
+        pass
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8", "replace")
+    raise TradeAPIError(status, payload[:ERROR_BODY_LIMIT])
+
+
+# Отдельная свеча, создается только при обращении к конкретному бару серии.
+class Candle(NamedTuple):
+    """
+    Одна свеча.
+    :param timestamp: Время начала свечи (UTC).
+    :param open: Цена открытия.
+    :param high: Максимальная цена.
+    :param low: Минимальная цена.
+    :param close: Цена закрытия.
+    :param volume: Объем в лотах.
+    """
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+
+# Колоночная серия свечей на массивах NumPy.
+class CandleSeries:
+    """
+    Компактная серия свечей, хранящая данные по колонкам.
+    Время хранится в секундах UTC (int64), цены в float64, объем в int64.
+    Объекты Candle создаются только при итерации или обращении по индексу.
+    """
+
+    __slots__ = ("timestamps", "open", "high", "low", "close", "volume")
+
+    def __init__(self, timestamps, open, high, low, close, volume):
+        """
+        Создание серии из готовых колонок.
+        :param timestamps: Время начала свечей в секундах UTC.
+        :param open: Цены открытия.
+        :param high: Максимальные цены.
+        :param low: Минимальные цены.
+        :param close: Цены закрытия.
+        :param volume: Объемы.
+        """
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    # Пустая серия.
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        """
+        Возвращает серию без свечей.
+        """
+        return cls([], [], [], [], [], [])
+
+    # Быстрое построение серии из JSON-ответа сервера.
+    @classmethod
+    def from_json(cls, payload) -> "CandleSeries":
+        """
+        Декодирует ответ /day-candles или /intraday-candles в серию свечей.
+        :param payload: Текст или байты ответа сервера.
+        :return: Серия свечей.
+        :raises TradeAPIError: Если сервер вернул ошибку.
+        :raises ValueError: Если ответ не в формате JSON (HTTP-статус проверяет check_response).
+        """
+        return cls.from_candles(unwrap_response(payload).get("candles") or [])
+
+    # Построение серии из списка свечей в формате сервера.
+    @classmethod
+    def from_candles(cls, candles: list) -> "CandleSeries":
+        """
+        Переводит список свечей в формате сервера в колонки.
+        Дневные свечи содержат поле date, интрадейные - timestamp.
+        :param candles: Список словарей свечей из ответа сервера.
+        :return: Серия свечей.
+        """
+        count = len(candles)
+        if not count:
+            return cls.empty()
+        key = "timestamp" if "timestamp" in candles[0] else "date"
+        # Отбрасываем суффикс часового пояса "Z": время сервера всегда в UTC.
+        timestamps = np.array([candle[key][:19] for candle in candles],
+                              dtype="datetime64[s]").astype(np.int64)
+        prices = []
+        for field in PRICE_FIELDS:
+            num = np.fromiter((candle[field]["num"] for candle in candles), dtype=np.int64, count=count)
+            scale = np.fromiter((candle[field]["scale"] for candle in candles), dtype=np.int64, count=count)
+            prices.append(num / np.power(10.0, scale))
+        volume = np.fromiter((candle["volume"] for candle in candles), dtype=np.int64, count=count)
+        return cls(timestamps, *prices, volume)
+
+    # Объединение нескольких серий в одну.
+    @classmethod
+    def concat(cls, series: list) -> "CandleSeries":
+        """
+        Склеивает серии в порядке следования.
+        :param series: Список серий свечей.
+        :return: Объединенная серия.
+        """
+        if not series:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(item, name) for item in series]) for name in cls.__slots__))
+
+    # Выборка свечей по времени.
+    def between(self, start: int = None, end: int = None) -> "CandleSeries":
+        """
+        Возвращает свечи с временем start <= timestamp < end.
+        Серия должна быть отсортирована по времени.
+        :param start: Нижняя граница в секундах UTC (None - без ограничения).
+        :param end: Верхняя граница в секундах UTC (None - без ограничения).
+        :return: Серия-срез без копирования данных.
+        """
+        left = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        right = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        return self[left:right]
+
+    # Получение отдельной свечи по номеру.
+    def candle(self, index: int) -> Candle:
+        """
+        Создает объект Candle для свечи с указанным номером.
+        :param index: Номер свечи в серии.
+        :return: Свеча.
+        """
+        return Candle(
+            datetime.fromtimestamp(int(self.timestamps[index]), tz=timezone.utc),
+            float(self.open[index]),
+            float(self.high[index]),
+            float(self.low[index]),
+            float(self.close[index]),
+            int(self.volume[index]))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.candle(index)
+
+    def __getitem__(self, item):
+        # Срез возвращает новую серию-представление над теми же массивами.
+        if isinstance(item, slice):
+            return CandleSeries(*(getattr(self, name)[item] for name in self.__slots__))
+        return self.candle(item)
+
+    def __repr__(self) -> str:
+        return f"CandleSeries(len={len(self)})"
+
+
+# Инструмент из справочника /securities.
+class Security(NamedTuple):
+    """
+    Параметры инструмента, нужные для подготовки ордеров.
+    :param board: Режим торгов.
+    :param code: Код инструмента.
+    :param ticker: Тикер инструмента.
+    :param market: Рынок.
+    :param short_name: Краткое наименование.
+    :param decimals: Количество знаков после запятой в цене.
+    :param lot_size: Размер лота.
+    :param min_step: Минимальный шаг цены в единицах 10^-decimals.
+    :param currency: Валюта цены.
+    """
+    board: str
+    code: str
+    ticker: str
+    market: str
+    short_name: str
+    decimals: int
+    lot_size: int
+    min_step: int
+    currency: str
+
+    # Построение инструмента из словаря в формате сервера.
+    @classmethod
+    def from_dict(cls, data: dict) -> "Security":
+        return cls(
+            board=data.get("board"),
+            code=data.get("code"),
+            ticker=data.get("ticker") or data.get("code"),
+            market=data.get("market"),
+            short_name=data.get("shortName"),
+            decimals=data.get("decimals") or 0,
+            lot_size=data.get("lotSize") or 1,
+            min_step=data.get("minStep") or 1,
+            currency=data.get("currency"))
+
+    # Шаг цены в единицах цены.
+    @property
+    def price_step(self) -> float:
+        return self.min_step / 10 ** self.decimals
+
+
+# Результат запроса по одному инструменту в пакетном запросе.
+class SymbolResult(NamedTuple):
+    """
+    Результат запроса по одному инструменту.
+    :param board: Режим торгов.
+    :param code: Код инструмента.
+    :param value: Результат запроса (None при ошибке).
+    :param error: Исключение, если запрос завершился ошибкой.
+    :param elapsed: Время выполнения запроса в секундах.
+    """
+    board: str
+    code: str
+    value: object
+    error: Exception
+    elapsed: float
+
+    # Признак успешного запроса.
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Результат пакетного запроса по списку инструментов.
+class BatchResult:
+    """
+    Результаты пакетного запроса, разделенные на успешные и ошибочные.
+    Все словари имеют ключ (режим торгов, код инструмента).
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+
+    # Метод для добавления результата по инструменту.
+    def add(self, result: SymbolResult):
+        """
+        Добавляет результат запроса по одному инструменту.
+        :param result: Результат запроса.
+        """
+        key = (result.board, result.code)
+        self.timings[key] = result.elapsed
+        if result.ok:
+            self.results[key] = result.value
+        else:
+            self.errors[key] = result.error
+
+    def __len__(self) -> int:
+        return len(self.timings)
+
+    def __repr__(self) -> str:
+        return f"BatchResult(ok={len(self.results)}, errors={len(self.errors)})"
+
+
+# Статусы ордера в ответе /orders.
+ORDER_STATUS_ACTIVE = "Active"
+ORDER_STATUS_MATCHED = "Matched"
+ORDER_STATUS_CANCELLED = "Cancelled"
+
+
+# Ордер из ответа /orders.
+class Order(NamedTuple):
+    """
+    Состояние ордера.
+    :param transaction_id: Идентификатор транзакции.
+    :param order_no: Биржевой номер ордера.
+    :param security_board: Режим торгов.
+    :param security_code: Код инструмента.
+    :param buy_sell: Направление (Buy, Sell).
+    :param status: Статус (None, Active, Matched, Cancelled).
+    :param price: Цена.
+    :param quantity: Количество лотов в ордере.
+    :param balance: Неисполненный остаток в лотах.
+    """
+    transaction_id: int
+    order_no: int
+    security_board: str
+    security_code: str
+    buy_sell: str
+    status: str
+    price: float
+    quantity: int
+    balance: int
+
+    # Построение ордера из словаря в формате сервера.
+    @classmethod
+    def from_dict(cls, data: dict) -> "Order":
+        quantity = data.get("quantity") or 0
+        balance = data.get("balance")
+        return cls(
+            transaction_id=data.get("transactionId"),
+            order_no=data.get("orderNo"),
+            security_board=data.get("securityBoard"),
+            security_code=data.get("securityCode"),
+            buy_sell=data.get("buySell"),
+            status=data.get("status"),
+            price=data.get("price"),
+            quantity=quantity,
+            balance=quantity if balance is None else balance)
+
+    # Исполненное количество лотов.
+    @property
+    def filled(self) -> int:
+        return self.quantity - self.balance
+
+    # Признак активного ордера.
+    @property
+    def active(self) -> bool:
+        return self.status == ORDER_STATUS_ACTIVE
@@ -0,0 +1,224 @@
+"""
+Выделенный канал выставления ордеров приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+import app.settings as settings
+from app.scheduler import GROUP_ACCOUNT, GROUP_ORDERS
+from app.utils import json_dumps
+
+
+# Метки полей шаблона ордера, которые меняются от ордера к ордеру.
+PRICE = "@@order-price@@"
+QUANTITY = "@@order-quantity@@"
+
+
+# Заранее сериализованный шаблон ордера.
+class OrderTemplate:
+    """
+    Шаблон тела запроса на размещение ордера.
+    Ордер сериализуется в JSON один раз; при выставлении в готовые байты
+    подставляются только цена и количество.
+    """
+
+    def __init__(self, order_data: dict):
+        """
+        Создание шаблона.
+        :param order_data: Данные ордера в формате place_order, в которых
+                           вместо цены стоит PRICE, а вместо количества - QUANTITY.
+                           Метка PRICE может встречаться несколько раз (например, в condition).
+        """
+        self.order_data = order_data
+        body = json_dumps(order_data)
+        markers = {json_dumps(PRICE): "price", json_dumps(QUANTITY): "quantity"}
+        # Разбиваем тело на неизменяемые куски и поля, подставляемые между ними.
+        self._parts = []
+        self._fields = []
+        position = 0
+        while True:
+            found = [(body.find(marker, position), marker) for marker in markers]
+            found = [(index, marker) for index, marker in found if index >= 0]
+            if not found:
+                break
+            index, marker = min(found)
+            self._parts.append(body[position:index])
+            self._fields.append(markers[marker])
+            position = index + len(marker)
+        self._parts.append(body[position:])
+
+    # Метод для получения тела запроса с заданными ценой и количеством.
+    def render(self, price: float, quantity: int) -> bytes:
+        """
+        Подставляет цену и количество в шаблон.
+        :param price: Цена ордера.
+        :param quantity: Количество лотов.
+        :return: Тело запроса в формате JSON.
+        """
+        values = {"price": repr(float(price)).encode(), "quantity": str(int(quantity)).encode()}
+        chunks = [self._parts[0]]
+        for field, part in zip(self._fields, self._parts[1:]):
+            chunks.append(values[field])
+            chunks.append(part)
+        return b"".join(chunks)
+
+
+# Выделенный канал выставления и снятия ордеров.
+class OrderEntry:
+    """
+    Канал с низкой задержкой для выставления и снятия ордеров.
+    Использует отдельный пул соединений, которые не заняты запросами рыночных данных
+    и открываются заранее методом warm(). Запросы проходят через планировщик клиента
+    в приоритетной группе ордеров. Для каждого запроса сохраняется время от отправки
+    до ответа сервера.
+    """
+
+    def __init__(self, client, connections: int = settings.ORDER_CONNECTIONS,
+                 history: int = settings.ORDER_LATENCY_HISTORY):
+        """
+        Инициализация канала.
+        :param client: Экземпляр TradeAPIClient.
+        :param connections: Количество соединений, зарезервированных под ордера.
+        :param history: Количество последних замеров задержки, которые хранятся.
+        """
+        self.client = client
+        self.connections = connections
+        self.latencies = {"place": deque(maxlen=history), "cancel": deque(maxlen=history)}
+        self._orders_url = f"{client.base_url}/orders"
+        self._check_url = f"{client.base_url}/access-tokens/check"
+        self._json_headers = dict(client.headers, **{"Content-Type": "application/json"})
+        self._session = None
+
+    # Вход в асинхронный контекстный менеджер: открываем соединения заранее.
+    async def __aenter__(self):
+        await self.warm()
+        return self
+
+    # Выход из асинхронного контекстного менеджера: закрываем соединения.
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Сессия канала с собственным пулом соединений.
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = self.client._create_session(self.connections, self.connections)
+        return self._session
+
+    # Асинхронный метод для прогрева соединений.
+    async def warm(self):
+        """
+        Открывает все соединения канала заранее легким запросом проверки токена,
+        чтобы первый ордер не тратил время на DNS и рукопожатия TCP/TLS.
+        """
+        session = self._get_session()
+
+        async def send():
+            loop_started = asyncio.get_running_loop().time()
+            async with session.get(self._check_url, headers=self.client.headers) as response:
+                body = await self.client._read(response, response.read, loop_started)
+                return response.status, response.headers.get("Retry-After"), body
+
+        await asyncio.gather(*(self.client.scheduler.submit(GROUP_ACCOUNT, send)
+                               for _ in range(self.connections)))
+
+    # Асинхронный метод для закрытия соединений канала.
+    async def close(self):
+        """
+        Закрывает соединения канала.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # Отправка запроса с замером задержки.
+    async def _submit(self, operation: str, method: str, idempotent: bool, **kwargs) -> str:
+        session = self._get_session()
+        latencies = self.latencies[operation]
+
+        async def send():
+            started = time.perf_counter()
+            loop_started = asyncio.get_running_loop().time()
+            async with session.request(method, self._orders_url, **kwargs) as response:
+                text = await self.client._read(response, response.text, loop_started)
+            latencies.append(time.perf_counter() - started)
+            return response.status, response.headers.get("Retry-After"), text
+
+        return await self.client.scheduler.submit(GROUP_ORDERS, send, idempotent=idempotent)
+
+    # Асинхронный метод для размещения ордера по шаблону.
+    async def place(self, template: OrderTemplate, price: float, quantity: int) -> str:
+        """
+        Размещает ордер по заранее сериализованному шаблону.
+        :param template: Шаблон ордера.
+        :param price: Цена ордера.
+        :param quantity: Количество лотов.
+        :return: Ответ сервера на запрос о размещении ордера.
+        """
+        return await self._submit("place", "POST", False,
+                                  data=template.render(price, quantity), headers=self._json_headers)
+
+    # Асинхронный метод для размещения ордера по словарю.
+    async def place_order(self, order_data: dict) -> str:
+        """
+        Размещает ордер, сериализуя словарь быстрым JSON-кодировщиком.
+        :param order_data: Словарь с данными ордера в формате place_order.
+        :return: Ответ сервера на запрос о размещении ордера.
+        """
+        return await self._submit("place", "POST", False,
+                                  data=json_dumps(order_data), headers=self._json_headers)
+
+    # Асинхронный метод для снятия ордера.
+    async def cancel(self, client_id: str, transaction_id: int) -> str:
+        """
+        Снимает ордер по идентификатору транзакции.
+        :param client_id: Идентификатор клиента.
+        :param transaction_id: Идентификатор транзакции ордера.
+        :return: Ответ сервера на запрос об отмене ордера.
+        """
+        return await self._submit("cancel", "DELETE", True, headers=self.client.headers,
+                                  params={"ClientId": client_id, "TransactionId": str(transaction_id)})
+
+    # Асинхронный метод для одновременного размещения нескольких ордеров.
+    async def place_many(self, orders: list) -> list:
+        """
+        Отправляет несколько ордеров одновременно по прогретым соединениям.
+        :param orders: Список кортежей (шаблон, цена, количество).
+        :return: Ответы сервера в порядке ордеров; ошибка запроса возвращается как исключение.
+        """
+        return await asyncio.gather(*(self.place(*order) for order in orders), return_exceptions=True)
+
+    # Асинхронный метод для одновременного снятия нескольких ордеров.
+    async def cancel_many(self, client_id: str, transaction_ids: list) -> list:
+        """
+        Снимает несколько ордеров одновременно по прогретым соединениям.
+        :param client_id: Идентификатор клиента.
+        :param transaction_ids: Идентификаторы транзакций ордеров.
+        :return: Ответы сервера в порядке транзакций; ошибка запроса возвращается как исключение.
+        """
+        return await asyncio.gather(*(self.cancel(client_id, transaction_id)
+                                      for transaction_id in transaction_ids), return_exceptions=True)
+
+    # Метод для получения статистики задержек.
+    def latency_stats(self) -> dict:
+        """
+        Возвращает статистику времени от отправки до ответа сервера в секундах
+        по операциям place и cancel: количество замеров, p50, p99 и максимум.
+        """
+        stats = {}
+        for operation, latencies in self.latencies.items():
+            values = np.fromiter(latencies, dtype=np.float64, count=len(latencies))
+            if not len(values):
+                stats[operation] = {"count": 0}
+                continue
+            stats[operation] = {
+                "count": len(values),
+                "p50": float(np.percentile(values, 50)),
+                "p99": float(np.percentile(values, 99)),
+                "max": float(values.max()),
+            }
+        return stats
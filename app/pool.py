@@ -0,0 +1,221 @@
+"""
+Пул клиентов с несколькими токенами приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+import multiprocessing
+import pickle
+import queue as queue_module
+from collections import Counter
+
+import app.settings as settings
+from app.batch import collect, iter_batch
+from app.client import TradeAPIClient
+from app.models import SymbolResult
+from app.scheduler import GROUP_DATA
+
+
+# Пул клиентов, распределяющий запросы между токенами.
+class ClientPool:
+    """
+    Набор экземпляров TradeAPIClient с разными токенами.
+    Запросы рыночных данных и справочника направляются клиенту с наименьшей
+    загрузкой: числом незавершенных запросов пула, деленным на текущую скорость
+    корзины токенов его планировщика. Лимиты каждого токена соблюдает
+    планировщик соответствующего клиента.
+    """
+
+    def __init__(self, api_tokens: list, api_url: str, **client_options):
+        """
+        Инициализация пула.
+        :param api_tokens: Ключи API, по одному клиенту на ключ.
+        :param api_url: Базовый URL API.
+        :param client_options: Дополнительные параметры конструктора TradeAPIClient.
+        """
+        if not api_tokens:
+            raise ValueError("Пул клиентов требует хотя бы один токен")
+        self.api_tokens = list(api_tokens)
+        self.api_url = api_url
+        self.client_options = client_options
+        self.clients = [TradeAPIClient(api_token=token, api_url=api_url, **client_options)
+                        for token in self.api_tokens]
+        self._pending = [0] * len(self.clients)
+
+    # Вход в асинхронный контекстный менеджер.
+    async def __aenter__(self):
+        return self
+
+    # Выход из асинхронного контекстного менеджера: закрываем всех клиентов.
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Асинхронный метод для закрытия всех клиентов пула.
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self.clients))
+
+    # Выбор наименее загруженного клиента.
+    def _pick(self, group: str) -> int:
+        def load(index):
+            return (self._pending[index] + 1) / self.clients[index].scheduler.buckets[group].rate
+        return min(range(len(self.clients)), key=load)
+
+    # Асинхронный метод для выполнения запроса на наименее загруженном клиенте.
+    async def call(self, func, group: str = GROUP_DATA):
+        """
+        Выполняет запрос на наименее загруженном клиенте пула.
+        :param func: Корутинная функция func(client), выполняющая запрос.
+        :param group: Группа эндпоинтов, по лимиту которой оценивается загрузка.
+        :return: Результат func.
+        """
+        index = self._pick(group)
+        self._pending[index] += 1
+        try:
+            return await func(self.clients[index])
+        finally:
+            self._pending[index] -= 1
+
+    # Асинхронный метод для запроса дневных свечей через пул.
+    async def get_day_candles_series(self, *args, **kwargs):
+        """
+        Запрос дневных свечей на наименее загруженном клиенте.
+        Параметры совпадают с TradeAPIClient.get_day_candles_series.
+        """
+        return await self.call(lambda client: client.get_day_candles_series(*args, **kwargs))
+
+    # Асинхронный метод для запроса интрадейных свечей через пул.
+    async def get_intraday_candles_series(self, *args, **kwargs):
+        """
+        Запрос интрадейных свечей на наименее загруженном клиенте.
+        Параметры совпадают с TradeAPIClient.get_intraday_candles_series.
+        """
+        return await self.call(lambda client: client.get_intraday_candles_series(*args, **kwargs))
+
+    # Асинхронный метод для запроса информации об инструменте через пул.
+    async def get_security(self, board: str, seccode: str):
+        """
+        Запрос параметров инструмента на наименее загруженном клиенте.
+        Параметры совпадают с TradeAPIClient.get_security.
+        """
+        return await self.call(lambda client: client.get_security(board, seccode))
+
+    # Асинхронный генератор для пакетного запроса через пул.
+    def iter_batch(self, symbols: list, method: str, concurrency: int = None, **kwargs):
+        """
+        Выполняет метод клиента по каждому инструменту, распределяя запросы между клиентами.
+        :param symbols: Список пар (режим торгов, код инструмента).
+        :param method: Имя метода TradeAPIClient, принимающего первыми аргументами
+                       режим торгов и код (например, get_day_candles_series или get_security).
+        :param concurrency: Максимум одновременных запросов (по умолчанию
+                            BATCH_CONCURRENCY на каждого клиента пула).
+        :param kwargs: Остальные именованные параметры метода.
+        :return: Асинхронный генератор SymbolResult в порядке завершения.
+        """
+        async def fetch(board, code):
+            return await self.call(lambda client: getattr(client, method)(board, code, **kwargs))
+        return iter_batch(symbols, fetch, concurrency or settings.BATCH_CONCURRENCY * len(self.clients))
+
+    # Асинхронный метод для пакетного запроса через пул.
+    async def batch(self, symbols: list, method: str, concurrency: int = None, **kwargs):
+        """
+        Выполняет метод клиента по каждому инструменту и собирает результаты.
+        Параметры совпадают с iter_batch.
+        :return: BatchResult с результатами, ошибками и временем запросов.
+        """
+        return await collect(self.iter_batch(symbols, method, concurrency, **kwargs))
+
+    # Асинхронный генератор для пакетного запроса в отдельных процессах.
+    async def iter_batch_processes(self, symbols: list, method: str,
+                                   concurrency: int = settings.BATCH_CONCURRENCY, **kwargs):
+        """
+        Выполняет пакетный запрос в рабочих процессах: по одному процессу на токен,
+        каждый со своим циклом событий и своим клиентом. Инструменты делятся между
+        процессами поровну, результаты передаются в родительский процесс по мере готовности.
+        Параметры клиента, метода и результаты должны сериализоваться pickle.
+        Если процесс аварийно завершился, не обработанные им инструменты
+        возвращаются с ошибкой RuntimeError.
+        :param symbols: Список пар (режим торгов, код инструмента).
+        :param method: Имя метода TradeAPIClient (см. iter_batch).
+        :param concurrency: Максимум одновременных запросов в каждом процессе.
+        :param kwargs: Остальные именованные параметры метода.
+        :return: Асинхронный генератор SymbolResult в порядке завершения.
+        """
+        symbols = [tuple(symbol) for symbol in symbols]
+        workers_count = min(len(self.api_tokens), len(symbols))
+        if not workers_count:
+            return
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        processes = [context.Process(
+            target=_process_worker,
+            args=(index, self.api_tokens[index], self.api_url, self.client_options, method, kwargs,
+                  symbols[index::workers_count], concurrency, queue),
+            daemon=True) for index in range(workers_count)]
+        for process in processes:
+            process.start()
+        loop = asyncio.get_running_loop()
+        # Инструменты, по которым процесс еще не вернул результат.
+        pending = [Counter(symbols[index::workers_count]) for index in range(workers_count)]
+        running = set(range(workers_count))
+        exited = set()
+        try:
+            while running:
+                try:
+                    index, result = await loop.run_in_executor(
+                        None, queue.get, True, settings.PROCESS_POLL_INTERVAL)
+                except queue_module.Empty:
+                    # Процесс, завершившийся до прошлой проверки, уже передал в очередь все результаты:
+                    # если сигнала о завершении так и нет, процесс аварийно остановлен.
+                    for index in sorted(exited & running):
+                        running.discard(index)
+                        error = RuntimeError(
+                            f"Рабочий процесс аварийно завершился с кодом {processes[index].exitcode}")
+                        for result in _lost_results(pending[index], error):
+                            yield result
+                    exited = {index for index in running if processes[index].exitcode is not None}
+                    continue
+                if result is None:
+                    running.discard(index)
+                    error = RuntimeError("Рабочий процесс завершился, не вернув результат")
+                    for result in _lost_results(pending[index], error):
+                        yield result
+                else:
+                    pending[index][(result.board, result.code)] -= 1
+                    yield result
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+
+# Результаты с ошибкой по инструментам, которые рабочий процесс не обработал.
+def _lost_results(pending: Counter, error: Exception) -> list:
+    return [SymbolResult(board, code, None, error, 0.0)
+            for (board, code), count in pending.items() for _ in range(count)]
+
+
+# Точка входа рабочего процесса пакетного запроса.
+def _process_worker(index, api_token, api_url, client_options, method, kwargs, symbols, concurrency, queue):
+    try:
+        asyncio.run(_process_batch(index, api_token, api_url, client_options, method, kwargs, symbols,
+                                   concurrency, queue))
+    finally:
+        # Сигнал родительскому процессу о завершении работы процесса.
+        queue.put((index, None))
+
+
+async def _process_batch(index, api_token, api_url, client_options, method, kwargs, symbols, concurrency,
+                         queue):
+    async with TradeAPIClient(api_token=api_token, api_url=api_url, **client_options) as client:
+        async def fetch(board, code):
+            return await getattr(client, method)(board, code, **kwargs)
+
+        async for result in iter_batch(symbols, fetch, concurrency):
+            # Исключения, которые нельзя передать между процессами, заменяются описанием.
+            if result.error is not None:
+                try:
+                    pickle.dumps(result.error)
+                except Exception:
+                    result = result._replace(error=RuntimeError(repr(result.error)))
+            queue.put((index, result))
@@ -0,0 +1,217 @@
+"""
+Планировщик запросов приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+import app.settings as settings
+
+
+# Группы эндпоинтов, для которых задаются лимиты и приоритеты.
+GROUP_ORDERS = "orders"
+GROUP_ACCOUNT = "account"
+GROUP_DATA = "data"
+
+# Минимальная доля базовой скорости, до которой корзина замедляется при ошибках.
+MIN_RATE_FACTOR = 0.1
+
+
+# Корзина токенов с очередью ожидающих по приоритету.
+class TokenBucket:
+    """
+    Ограничитель скорости по алгоритму token bucket.
+    Ожидающие запросы обслуживаются в порядке приоритета, внутри приоритета - по очереди.
+    Скорость адаптивно снижается при ответах 429/5xx и восстанавливается при успешных.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Инициализация корзины.
+        :param rate: Скорость пополнения, токенов в секунду.
+        :param capacity: Максимальное количество токенов в корзине.
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._drain_task = None
+
+    # Пополнение корзины за прошедшее время.
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Количество запросов, ожидающих токен.
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    # Асинхронный метод для получения токена.
+    async def acquire(self, priority: int = 0):
+        """
+        Ожидает свободный токен.
+        :param priority: Приоритет запроса, меньшее значение обслуживается раньше.
+        """
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.ensure_future(self._drain())
+        await future
+
+    # Выдача токенов ожидающим по мере пополнения корзины.
+    async def _drain(self):
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            # Ожидание могло быть отменено вызывающим кодом.
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+
+    # Метод для замедления корзины после ответа 429/5xx.
+    def penalize(self, delay: float = 0):
+        """
+        Вдвое снижает скорость корзины и при необходимости приостанавливает выдачу токенов.
+        :param delay: Пауза в секундах, на которую откладывается выдача следующего токена.
+        """
+        self._refill()
+        self.rate = max(self.base_rate * MIN_RATE_FACTOR, self.rate / 2)
+        if delay:
+            self.tokens = min(self.tokens, -delay * self.rate)
+
+    # Метод для постепенного восстановления скорости после успешного ответа.
+    def recover(self):
+        """
+        Увеличивает скорость корзины на 10% от базовой, но не выше базовой.
+        """
+        if self.rate < self.base_rate:
+            self._refill()
+            self.rate = min(self.base_rate, self.rate + self.base_rate * MIN_RATE_FACTOR)
+
+
+# Планировщик, через который проходят все запросы клиента.
+class RequestScheduler:
+    """
+    Планировщик запросов с лимитами по группам эндпоинтов и общим лимитом токена.
+    Каждая группа - отдельная полоса со своим приоритетом: ордера обслуживаются
+    раньше запросов рыночных данных. При ответах 429/5xx выполняется повтор
+    с экспоненциальной паузой (или паузой из заголовка Retry-After); на время паузы
+    замедляется полоса группы. Ответ, который не повторяется, полосу не замедляет.
+    """
+
+    def __init__(
+            self,
+            rate_limits: dict = None,
+            global_rate_limit: tuple = settings.GLOBAL_RATE_LIMIT,
+            priorities: dict = None,
+            max_retries: int = settings.MAX_RETRIES,
+            backoff_base: float = settings.BACKOFF_BASE,
+            backoff_max: float = settings.BACKOFF_MAX):
+        """
+        Инициализация планировщика.
+        :param rate_limits: Лимиты групп {группа: (запросов в секунду, емкость)}.
+        :param global_rate_limit: Общий лимит (запросов в секунду, емкость).
+        :param priorities: Приоритеты групп {группа: приоритет}.
+        :param max_retries: Максимум повторов при ответах 429/5xx.
+        :param backoff_base: Начальная пауза перед повтором в секундах.
+        :param backoff_max: Максимальная пауза перед повтором в секундах.
+        """
+        rate_limits = rate_limits or settings.RATE_LIMITS
+        self.priorities = priorities or settings.REQUEST_PRIORITIES
+        self.buckets = {group: TokenBucket(*limit) for group, limit in rate_limits.items()}
+        self.global_bucket = TokenBucket(*global_rate_limit)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._metrics = {group: {
+            "in_flight": 0,
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        } for group in rate_limits}
+
+    # Асинхронный метод для выполнения запроса через планировщик.
+    async def submit(self, group: str, send, idempotent: bool = True):
+        """
+        Выполняет запрос с учетом лимитов и приоритета группы.
+        :param group: Группа эндпоинтов (orders, account, data).
+        :param send: Корутинная функция без аргументов, возвращающая
+                     (HTTP-статус, значение Retry-After или None, текст ответа).
+        :param idempotent: Можно ли повторять запрос после ответа 5xx.
+                           Ответ 429 означает, что запрос не принят, и повторяется всегда.
+        :return: Текст ответа сервера.
+        """
+        bucket = self.buckets[group]
+        priority = self.priorities.get(group, 0)
+        metrics = self._metrics[group]
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            await bucket.acquire(priority)
+            await self.global_bucket.acquire(priority)
+            wait = time.monotonic() - started
+            metrics["requests"] += 1
+            metrics["wait_total"] += wait
+            metrics["wait_max"] = max(metrics["wait_max"], wait)
+            metrics["in_flight"] += 1
+            try:
+                status, retry_after, text = await send()
+            finally:
+                metrics["in_flight"] -= 1
+            if status != 429 and status < 500:
+                bucket.recover()
+                self.global_bucket.recover()
+                return text
+            metrics["throttled"] += 1
+            # Полоса замедляется только перед повтором: ответ, который не будет повторен,
+            # не должен задерживать следующие запросы группы (например, ордера).
+            if attempt >= self.max_retries or (status != 429 and not idempotent):
+                return text
+            bucket.penalize(self._retry_delay(retry_after, attempt))
+            if status == 429:
+                self.global_bucket.penalize()
+            attempt += 1
+            metrics["retries"] += 1
+
+    # Пауза перед повтором запроса.
+    def _retry_delay(self, retry_after, attempt: int) -> float:
+        try:
+            return min(self.backoff_max, float(retry_after))
+        except (TypeError, ValueError):
+            return min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+    # Метод для получения метрик планировщика.
+    def metrics(self) -> dict:
+        """
+        Возвращает метрики по группам: глубину очереди, число запросов в работе,
+        количество запросов, повторов и ответов 429/5xx, суммарное, среднее
+        и максимальное время ожидания в очереди в секундах, текущую скорость корзины.
+        """
+        result = {}
+        for group, metrics in self._metrics.items():
+            bucket = self.buckets[group]
+            result[group] = dict(
+                metrics,
+                queue_depth=bucket.queue_depth,
+                wait_avg=metrics["wait_total"] / metrics["requests"] if metrics["requests"] else 0.0,
+                rate=bucket.rate)
+        result["global"] = {"queue_depth": self.global_bucket.queue_depth, "rate": self.global_bucket.rate}
+        return result
@@ -0,0 +1,151 @@
+"""
+Справочник инструментов приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+
+import app.settings as settings
+from app.models import Security, unwrap_response
+from app.utils import SingleFlight
+
+
+# Индекс справочника инструментов в памяти.
+class SecuritiesIndex:
+    """
+    Справочник инструментов, загружаемый один раз и обновляемый в фоне по TTL.
+    Поиск по (режим торгов, код) и по тикеру выполняется из словарей в памяти
+    без обращения к серверу. Одновременные запросы одного и того же ключа
+    к серверу объединяются в один вызов.
+    """
+
+    def __init__(self, client, ttl: float = settings.SECURITIES_TTL):
+        """
+        Инициализация справочника.
+        :param client: Экземпляр TradeAPIClient.
+        :param ttl: Интервал фонового обновления справочника в секундах.
+        """
+        self.client = client
+        self.ttl = ttl
+        self.last_error = None
+        self._by_key = {}
+        self._by_ticker = {}
+        self._flight = SingleFlight()
+        self._refresh_task = None
+
+    # Вход в асинхронный контекстный менеджер: загрузка и запуск фонового обновления.
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    # Выход из асинхронного контекстного менеджера: остановка фонового обновления.
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # Асинхронный метод для загрузки справочника и запуска фонового обновления.
+    async def start(self):
+        """
+        Загружает весь справочник инструментов и запускает его фоновое обновление.
+        """
+        await self.load()
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh_loop())
+
+    # Асинхронный метод для остановки фонового обновления.
+    async def stop(self):
+        """
+        Останавливает фоновое обновление справочника.
+        """
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    # Асинхронный метод для загрузки всего справочника.
+    async def load(self):
+        """
+        Загружает весь справочник инструментов и заменяет им текущий индекс.
+        Одновременные вызовы выполняют одну загрузку.
+        """
+        await self._flight.run(None, self._load)
+
+    async def _load(self):
+        # Разбор всего справочника выполняется в decode_executor клиента, если он задан.
+        by_key, by_ticker = await self.client.decode(_build_index, await self.client.get_securities())
+        # Индекс заменяется целиком, поэтому читатели не видят частично загруженных данных.
+        self._by_key = by_key
+        self._by_ticker = by_ticker
+
+    # Периодическое обновление справочника.
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.load()
+                self.last_error = None
+            except Exception as error:
+                # При ошибке обновления продолжаем работать с прежними данными.
+                self.last_error = error
+
+    # Метод для поиска инструмента по режиму торгов и коду.
+    def get(self, board: str, code: str) -> Security:
+        """
+        Возвращает инструмент из индекса без обращения к серверу.
+        :param board: Режим торгов.
+        :param code: Код инструмента.
+        :return: Инструмент или None, если его нет в индексе.
+        """
+        return self._by_key.get((board, code))
+
+    # Метод для поиска инструментов по тикеру.
+    def by_ticker(self, ticker: str) -> list:
+        """
+        Возвращает инструменты с указанным тикером на всех режимах торгов.
+        :param ticker: Тикер инструмента.
+        :return: Список инструментов (пустой, если тикер не найден).
+        """
+        return list(self._by_ticker.get(ticker, ()))
+
+    # Асинхронный метод для поиска инструмента с запросом к серверу при отсутствии в индексе.
+    async def lookup(self, board: str, code: str) -> Security:
+        """
+        Возвращает инструмент из индекса, а если его там нет, запрашивает его у сервера.
+        Одновременные запросы одного инструмента выполняют один вызов к серверу.
+        :param board: Режим торгов.
+        :param code: Код инструмента.
+        :return: Инструмент или None, если сервер его не знает.
+        """
+        security = self.get(board, code)
+        if security is None:
+            security = await self._flight.run((board, code), lambda: self._fetch(board, code))
+        return security
+
+    async def _fetch(self, board: str, code: str) -> Security:
+        try:
+            security = await self.client.get_security(board, code)
+        except LookupError:
+            return None
+        self._by_key[(board, code)] = security
+        self._by_ticker.setdefault(security.ticker, []).append(security)
+        return security
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._by_key
+
+
+# Построение индексов справочника из ответа get_securities.
+def _build_index(payload) -> tuple:
+    data = unwrap_response(payload)
+    by_key = {}
+    by_ticker = {}
+    for item in data.get("securities") or []:
+        security = Security.from_dict(item)
+        by_key[(security.board, security.code)] = security
+        by_ticker.setdefault(security.ticker, []).append(security)
+    return by_key, by_ticker
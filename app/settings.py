@@ -1 +1,49 @@
-API_URL = "https://trade-api.finam.ru/public/api/v1"
\ No newline at end of file
+API_URL = "https://trade-api.finam.ru/public/api/v1"
+
+# Параметры пула соединений TradeAPIClient
+CONNECTION_LIMIT = 100           # Общий лимит одновременных соединений
+CONNECTION_LIMIT_PER_HOST = 20   # Лимит соединений на один хост
+DNS_CACHE_TTL = 300              # Время жизни кэша DNS, секунды
+KEEPALIVE_TIMEOUT = 60           # Время удержания простаивающего соединения, секунды
+REQUEST_TIMEOUT = 30             # Общий таймаут запроса, секунды
+CONNECT_TIMEOUT = 10             # Таймаут установки соединения, секунды
+
+# Параметры загрузки истории свечей
+INTRADAY_MAX_CANDLES = 500       # Максимум свечей, отдаваемых сервером за один запрос
+BACKFILL_CONCURRENCY = 4         # Количество одновременно загружаемых окон истории
+DAY_MAX_CANDLES = 500            # Окно загрузки дневных свечей в календарных днях (свечей в нем не больше)
+
+# Параметры планировщика запросов: лимиты подберите под лимиты своего токена
+# Группа эндпоинтов: (запросов в секунду, емкость корзины токенов)
+RATE_LIMITS = {
+    "orders": (10, 10),    # Выставление и снятие ордеров
+    "account": (5, 5),     # Портфель, список ордеров, проверка токена
+    "data": (5, 10),       # Свечи и справочник инструментов
+}
+GLOBAL_RATE_LIMIT = (20, 20)   # Общий лимит всех запросов токена
+# Приоритет групп: меньшее значение обслуживается раньше
+REQUEST_PRIORITIES = {"orders": 0, "account": 1, "data": 2}
+MAX_RETRIES = 3                # Повторы при ответах 429/5xx
+BACKOFF_BASE = 0.5             # Начальная пауза перед повтором, секунды
+BACKOFF_MAX = 10               # Максимальная пауза перед повтором, секунды
+
+# Время жизни справочника инструментов до фонового обновления, секунды
+SECURITIES_TTL = 3600
+
+# Количество одновременных запросов в пакетных методах клиента
+BATCH_CONCURRENCY = 8
+
+# Интервал проверки рабочих процессов пакетного запроса ClientPool, секунды
+PROCESS_POLL_INTERVAL = 1.0
+
+# Параметры выделенного канала выставления ордеров
+ORDER_CONNECTIONS = 2           # Количество заранее открытых соединений для ордеров
+ORDER_LATENCY_HISTORY = 1000    # Количество последних замеров задержки ордеров
+
+# Параметры отслеживания ордеров
+ORDER_POLL_ACTIVE_INTERVAL = 0.5   # Интервал опроса при наличии активных ордеров, секунды
+ORDER_POLL_IDLE_INTERVAL = 5       # Интервал опроса без активных ордеров, секунды
+ORDER_FULL_POLL_EVERY = 20         # Каждый N-й опрос запрашивает также исполненные и снятые ордера
+
+# Размер порции тела ответа при потоковом декодировании свечей, байты
+STREAM_CHUNK_SIZE = 64 * 1024
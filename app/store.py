@@ -0,0 +1,184 @@
+"""
+Локальное хранилище свечей приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from app.models import CandleSeries
+
+
+# Колонки серии свечей и типы, в которых они хранятся на диске.
+COLUMNS = (
+    ("timestamps", np.dtype("<i8")),
+    ("open", np.dtype("<f8")),
+    ("high", np.dtype("<f8")),
+    ("low", np.dtype("<f8")),
+    ("close", np.dtype("<f8")),
+    ("volume", np.dtype("<i8")),
+)
+
+
+# Функция для объединения пересекающихся интервалов.
+def merge_intervals(intervals: list) -> list:
+    """
+    Объединяет пересекающиеся и смежные интервалы [start, end).
+    :param intervals: Список пар (start, end).
+    :return: Отсортированный список непересекающихся интервалов.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+# Хранилище свечей в колоночных файлах с отображением в память.
+class CandleStore:
+    """
+    Локальное хранилище свечей по ключу (режим торгов, тикер, таймфрейм).
+    Каждая колонка серии хранится в отдельном файле и читается через
+    np.memmap, поэтому чтение не копирует данные. Новые свечи дописываются
+    в конец файлов; вставка в середину истории перезаписывает файлы целиком.
+    Рядом с колонками хранится meta.json с числом строк и покрытыми интервалами.
+    """
+
+    def __init__(self, root):
+        """
+        Инициализация хранилища.
+        :param root: Каталог, в котором хранятся файлы свечей.
+        """
+        self.root = Path(root)
+
+    # Каталог с файлами одной серии.
+    def _path(self, security_board: str, security_code: str, time_frame: str) -> Path:
+        return self.root / security_board / security_code / time_frame
+
+    # Чтение метаданных серии.
+    @staticmethod
+    def _load_meta(path: Path) -> dict:
+        try:
+            with open(path / "meta.json", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"rows": 0, "coverage": []}
+
+    # Атомарная запись метаданных серии.
+    @staticmethod
+    def _save_meta(path: Path, meta: dict):
+        temp_path = path / "meta.json.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(temp_path, path / "meta.json")
+
+    # Чтение всей серии из файлов без копирования.
+    @staticmethod
+    def _map(path: Path, rows: int) -> CandleSeries:
+        if not rows:
+            return CandleSeries.empty()
+        return CandleSeries(*(np.memmap(path / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+                              for name, dtype in COLUMNS))
+
+    # Метод для чтения свечей из хранилища.
+    def read(self, security_board: str, security_code: str, time_frame: str,
+             start: int = None, end: int = None) -> CandleSeries:
+        """
+        Возвращает свечи из хранилища с временем start <= timestamp < end.
+        Колонки серии отображены в память и не копируются.
+        :param security_board: Режим торгов.
+        :param security_code: Тикер инструмента.
+        :param time_frame: Таймфрейм.
+        :param start: Начало периода в секундах UTC (None - с начала).
+        :param end: Конец периода в секундах UTC (None - до конца).
+        :return: Серия свечей.
+        """
+        path = self._path(security_board, security_code, time_frame)
+        return self._map(path, self._load_meta(path)["rows"]).between(start, end)
+
+    # Метод для поиска периодов, которых нет в хранилище.
+    def missing(self, security_board: str, security_code: str, time_frame: str,
+                start: int, end: int) -> list:
+        """
+        Возвращает части периода [start, end), которые еще не загружались.
+        :param security_board: Режим торгов.
+        :param security_code: Тикер инструмента.
+        :param time_frame: Таймфрейм.
+        :param start: Начало периода в секундах UTC.
+        :param end: Конец периода в секундах UTC.
+        :return: Список пар (start, end) незагруженных периодов.
+        """
+        path = self._path(security_board, security_code, time_frame)
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self._load_meta(path)["coverage"]:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = covered_end
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # Метод для сохранения свечей в хранилище.
+    def write(self, security_board: str, security_code: str, time_frame: str,
+              series: CandleSeries, start: int, end: int):
+        """
+        Сохраняет свечи, загруженные за период [start, end), и отмечает период как покрытый.
+        Свечи вне периода отбрасываются.
+        :param security_board: Режим торгов.
+        :param security_code: Тикер инструмента.
+        :param time_frame: Таймфрейм.
+        :param series: Загруженные свечи, отсортированные по времени.
+        :param start: Начало загруженного периода в секундах UTC.
+        :param end: Конец загруженного периода в секундах UTC.
+        """
+        path = self._path(security_board, security_code, time_frame)
+        path.mkdir(parents=True, exist_ok=True)
+        meta = self._load_meta(path)
+        rows = meta["rows"]
+        series = series.between(start, end)
+        if len(series):
+            stored = self._map(path, rows)
+            if not rows or series.timestamps[0] > stored.timestamps[-1]:
+                self._append(path, rows, series)
+                rows += len(series)
+            else:
+                rows = self._rewrite(path, stored, series)
+        meta["rows"] = rows
+        meta["coverage"] = merge_intervals(meta["coverage"] + [[start, end]])
+        self._save_meta(path, meta)
+
+    # Дописывание свечей в конец колоночных файлов.
+    @staticmethod
+    def _append(path: Path, rows: int, series: CandleSeries):
+        for name, dtype in COLUMNS:
+            column_path = path / f"{name}.bin"
+            with open(column_path, "r+b" if column_path.exists() else "wb") as file:
+                # Позиция берется из meta.json, чтобы недописанный хвост после сбоя был затерт.
+                file.seek(rows * dtype.itemsize)
+                file.write(np.ascontiguousarray(getattr(series, name), dtype=dtype).tobytes())
+                file.truncate()
+
+    # Перезапись колоночных файлов с вставкой свечей в середину истории.
+    @staticmethod
+    def _rewrite(path: Path, stored: CandleSeries, series: CandleSeries) -> int:
+        merged = CandleSeries.concat([stored, series])
+        order = np.argsort(merged.timestamps, kind="stable")
+        timestamps = merged.timestamps[order]
+        # Для повторяющихся свечей оставляем последнюю, то есть только что загруженную.
+        keep = order[np.append(timestamps[1:] != timestamps[:-1], True)]
+        for name, dtype in COLUMNS:
+            temp_path = path / f"{name}.bin.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(np.ascontiguousarray(getattr(merged, name)[keep], dtype=dtype).tobytes())
+            os.replace(temp_path, path / f"{name}.bin")
+        return len(keep)
@@ -0,0 +1,232 @@
+"""
+Отслеживание состояния ордеров приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+from typing import NamedTuple
+
+import app.settings as settings
+from app.models import ORDER_STATUS_CANCELLED, ORDER_STATUS_MATCHED, Order, unwrap_response
+
+
+# Виды изменений ордера.
+EVENT_NEW = "new"
+EVENT_PARTIAL_FILL = "partial_fill"
+EVENT_MATCHED = "matched"
+EVENT_CANCELED = "canceled"
+
+# Конечные статусы ордера, после которых он больше не меняется.
+FINAL_STATUSES = (ORDER_STATUS_MATCHED, ORDER_STATUS_CANCELLED)
+
+
+# Изменение состояния ордера между двумя опросами.
+class OrderEvent(NamedTuple):
+    """
+    Изменение ордера.
+    :param kind: Вид изменения (new, partial_fill, matched, canceled).
+    :param order: Новое состояние ордера.
+    :param previous: Предыдущее состояние ордера (None для нового ордера).
+    """
+    kind: str
+    order: Order
+    previous: Order
+
+
+# Функция для вычисления изменений ордера.
+def diff_order(previous: Order, order: Order) -> list:
+    """
+    Сравнивает два состояния ордера.
+    :param previous: Предыдущее состояние (None, если ордер раньше не встречался).
+    :param order: Новое состояние.
+    :return: Список OrderEvent.
+    """
+    events = []
+    if previous is None:
+        events.append(OrderEvent(EVENT_NEW, order, None))
+    elif order.balance < previous.balance and order.status not in FINAL_STATUSES:
+        events.append(OrderEvent(EVENT_PARTIAL_FILL, order, previous))
+    if order.status != (previous.status if previous is not None else None):
+        if order.status == ORDER_STATUS_MATCHED:
+            events.append(OrderEvent(EVENT_MATCHED, order, previous))
+        elif order.status == ORDER_STATUS_CANCELLED:
+            events.append(OrderEvent(EVENT_CANCELED, order, previous))
+    return events
+
+
+# Функция для декодирования ответа get_orders.
+def parse_orders(payload) -> list:
+    """
+    Декодирует ответ get_orders.
+    :param payload: Ответ сервера (строка, байты или словарь).
+    :return: Список Order.
+    :raises TradeAPIError: Если сервер вернул ошибку.
+    """
+    return [Order.from_dict(item) for item in unwrap_response(payload).get("orders") or []]
+
+
+# Фоновое отслеживание ордеров с вычислением изменений.
+class OrderTracker:
+    """
+    Опрашивает get_orders в фоне и хранит книгу ордеров по идентификатору транзакции.
+    Обычный опрос запрашивает только активные ордера, поэтому его стоимость
+    не растет с числом исполненных за сессию ордеров. Полный опрос (с исполненными
+    и снятыми) выполняется при старте, когда активный ордер пропал из ответа,
+    и каждый full_poll_every-й раз, чтобы заметить ордера, исполненные между опросами.
+    Интервал опроса короткий, пока есть активные ордера, и длинный, когда их нет.
+    """
+
+    def __init__(
+            self,
+            client,
+            client_id: str,
+            active_interval: float = settings.ORDER_POLL_ACTIVE_INTERVAL,
+            idle_interval: float = settings.ORDER_POLL_IDLE_INTERVAL,
+            full_poll_every: int = settings.ORDER_FULL_POLL_EVERY):
+        """
+        Инициализация отслеживания.
+        :param client: Экземпляр TradeAPIClient.
+        :param client_id: Идентификатор клиента.
+        :param active_interval: Интервал опроса при наличии активных ордеров в секундах.
+        :param idle_interval: Интервал опроса без активных ордеров в секундах.
+        :param full_poll_every: Каждый N-й опрос выполняется полным.
+        """
+        self.client = client
+        self.client_id = client_id
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.full_poll_every = full_poll_every
+        self.orders = {}
+        self.last_error = None
+        self._polls = 0
+        self._subscribers = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    # Вход в асинхронный контекстный менеджер: начальная загрузка и запуск опроса.
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    # Выход из асинхронного контекстного менеджера: остановка опроса.
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    # Асинхронный метод для запуска фонового опроса.
+    async def start(self):
+        """
+        Загружает текущие ордера без генерации событий и запускает фоновый опрос.
+        """
+        self._apply(await self._fetch(full=True), publish=False)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._poll_loop())
+
+    # Асинхронный метод для остановки фонового опроса.
+    async def stop(self):
+        """
+        Останавливает фоновый опрос и завершает потоки событий подписчиков.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    # Метод для внеочередного опроса.
+    def notify(self):
+        """
+        Запускает следующий опрос немедленно, например сразу после выставления ордера.
+        """
+        self._wakeup.set()
+
+    # Асинхронный генератор событий изменения ордеров.
+    async def events(self):
+        """
+        Поток изменений ордеров. Каждый подписчик получает все события,
+        произошедшие после подписки. Поток завершается при остановке отслеживания.
+        :return: Асинхронный генератор OrderEvent.
+        """
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+    # Метод для получения ордера по идентификатору транзакции.
+    def get(self, transaction_id: int) -> Order:
+        return self.orders.get(transaction_id)
+
+    # Метод для получения активных ордеров.
+    def active(self) -> list:
+        return [order for order in self.orders.values() if order.status not in FINAL_STATUSES]
+
+    # Асинхронный метод для одного опроса.
+    async def poll(self, full: bool = False) -> list:
+        """
+        Опрашивает сервер, обновляет книгу ордеров и рассылает изменения подписчикам.
+        :param full: Запросить также исполненные и снятые ордера.
+        :return: Список изменений OrderEvent.
+        """
+        orders = await self._fetch(full)
+        missing = self._missing(orders)
+        # Активный ордер пропал из ответа: узнаем его итоговый статус полным опросом.
+        if missing and not full:
+            full = True
+            orders = await self._fetch(full)
+            missing = self._missing(orders)
+        if full:
+            # Ордера, которых нет даже в полном ответе, сервер больше не возвращает.
+            for transaction_id in missing:
+                del self.orders[transaction_id]
+        return self._apply(orders)
+
+    # Запрос ордеров у сервера.
+    async def _fetch(self, full: bool) -> list:
+        return await self.client.decode(parse_orders, await self.client.get_orders(
+            self.client_id, include_matched=full, include_canceled=full, include_active=True))
+
+    # Незавершенные ордера книги, которых нет в ответе сервера.
+    def _missing(self, orders: list) -> set:
+        seen = {order.transaction_id for order in orders}
+        return {transaction_id for transaction_id, order in self.orders.items()
+                if order.status not in FINAL_STATUSES and transaction_id not in seen}
+
+    # Обновление книги ордеров и рассылка изменений.
+    def _apply(self, orders: list, publish: bool = True) -> list:
+        events = []
+        for order in orders:
+            previous = self.orders.get(order.transaction_id)
+            if previous != order:
+                events += diff_order(previous, order)
+                self.orders[order.transaction_id] = order
+        if publish:
+            for event in events:
+                for queue in self._subscribers:
+                    queue.put_nowait(event)
+        return events
+
+    # Цикл фонового опроса с адаптивным интервалом.
+    async def _poll_loop(self):
+        while True:
+            interval = self.active_interval if self.active() else self.idle_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._polls += 1
+            try:
+                await self.poll(full=self._polls % self.full_poll_every == 0)
+                self.last_error = None
+            except Exception as error:
+                # Ошибка опроса не останавливает отслеживание: повторим на следующем цикле.
+                self.last_error = error
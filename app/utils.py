@@ -0,0 +1,267 @@
+"""
+Вспомогательные функции приложения async-finam-rest-api-client
+для работы с Trade API Finam
+"""
+
+import asyncio
+import json
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# orjson разбирает и сериализует JSON в несколько раз быстрее стандартной библиотеки.
+# Он указан в requirements.txt; без него (например, на платформе без готовой сборки)
+# используется стандартный модуль json с предупреждением.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    warnings.warn("orjson не установлен: JSON разбирается и сериализуется стандартным модулем json. "
+                  "Установите зависимости из requirements.txt", RuntimeWarning)
+
+
+# Функция для быстрого разбора JSON-ответа сервера.
+def json_loads(payload):
+    """
+    Разбирает JSON из строки или байтов.
+    Использует orjson, если он установлен, иначе стандартный модуль json.
+    :param payload: Текст или байты ответа сервера.
+    :return: Разобранный объект Python.
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Функция для быстрой сериализации в JSON.
+def json_dumps(value) -> bytes:
+    """
+    Сериализует объект в компактный JSON.
+    Использует orjson, если он установлен, иначе стандартный модуль json.
+    :param value: Объект Python.
+    :return: JSON в виде байтов UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Длительность интрадейных таймфреймов Trade API в минутах.
+TIME_FRAME_MINUTES = {"M1": 1, "M5": 5, "M15": 15, "M30": 30, "H1": 60, "H4": 240}
+
+# Дневные таймфреймы, которые запрашиваются через /day-candles.
+DAY_TIME_FRAME_MINUTES = {"D1": 1440}
+
+# Смещение московского времени от UTC в секундах.
+MOSCOW_UTC_OFFSET = 3 * 3600
+
+# Торговые сессии Московской биржи по московскому времени, минуты от полуночи:
+# утренняя, основная и вечерняя. Свечи в перерывах относятся к предыдущей сессии.
+MOEX_SESSIONS = ((6 * 60 + 50, 9 * 60 + 50), (10 * 60, 18 * 60 + 50), (19 * 60, 23 * 60 + 50))
+
+
+# Функция для приведения времени к datetime.
+def parse_time(value) -> datetime:
+    """
+    Приводит время к datetime без часового пояса (UTC, как на сервере).
+    :param value: datetime или строка в формате yyyy-mm-dd[THH:MM:SS].
+    :return: Время в виде datetime.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.rstrip("Z"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Функция для перевода времени в секунды UTC.
+def to_timestamp(value) -> int:
+    """
+    Переводит время в количество секунд UTC, как в CandleSeries.timestamps.
+    :param value: datetime или строка в формате yyyy-mm-dd[THH:MM:SS].
+    :return: Время в секундах UTC.
+    """
+    return int(parse_time(value).replace(tzinfo=timezone.utc).timestamp())
+
+
+# Функция для перевода секунд UTC во время.
+def from_timestamp(value: int) -> datetime:
+    """
+    Переводит количество секунд UTC в datetime без часового пояса.
+    :param value: Время в секундах UTC.
+    :return: Время в виде datetime.
+    """
+    return datetime.fromtimestamp(int(value), tz=timezone.utc).replace(tzinfo=None)
+
+
+# Функция для форматирования времени в параметр запроса.
+def format_time(value: datetime) -> str:
+    """
+    Форматирует время для параметров Interval.From/Interval.To.
+    :param value: Время в виде datetime.
+    :return: Строка в формате yyyy-mm-ddTHH:MM:SS.
+    """
+    return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# Функция для разбиения интервала времени на окна.
+def split_interval(start: datetime, end: datetime, step: timedelta) -> list:
+    """
+    Разбивает интервал [start, end] на последовательные окна длиной не более step.
+    :param start: Начало интервала.
+    :param end: Конец интервала.
+    :param step: Максимальная длина окна.
+    :return: Список пар (начало окна, конец окна).
+    """
+    windows = []
+    while start < end:
+        window_end = min(start + step, end)
+        windows.append((start, window_end))
+        start = window_end
+    return windows
+
+
+# Объединение одновременных одинаковых запросов в один.
+class SingleFlight:
+    """
+    Выполняет не более одного вызова на ключ одновременно.
+    Корутины, запросившие тот же ключ во время выполнения вызова,
+    получают его результат вместо повторного обращения к серверу.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    # Асинхронный метод для выполнения вызова по ключу.
+    async def run(self, key, func):
+        """
+        Выполняет func() или присоединяется к уже выполняющемуся вызову с тем же ключом.
+        :param key: Ключ вызова.
+        :param func: Корутинная функция без аргументов.
+        :return: Результат вызова.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Отмена одного из ожидающих не должна отменять общий вызов.
+        return await asyncio.shield(future)
+
+
+# Вычисление начала старшей свечи для каждой исходной свечи.
+def _bucket_starts(timestamps, time_frame: str, sessions: tuple, utc_offset: int):
+    local = timestamps + utc_offset
+    day = local - local % 86400
+    if time_frame in DAY_TIME_FRAME_MINUTES:
+        # Дневная свеча помечается полуночью UTC московской даты, как свечи /day-candles.
+        return day
+    step = TIME_FRAME_MINUTES[time_frame] * 60
+    session_starts = np.array([start for start, _ in sessions], dtype=np.int64) * 60
+    session = np.searchsorted(session_starts, local - day, side="right") - 1
+    session_start = np.where(session >= 0, session_starts[np.maximum(session, 0)], 0)
+    # Старшая свеча не начинается раньше своей сессии, поэтому свечи разных сессий не смешиваются.
+    return np.maximum(local - local % step, day + session_start) - utc_offset
+
+
+# Агрегация свечей по началам старших свечей.
+def _aggregate(series, starts):
+    if not len(starts):
+        return series[0:0], np.zeros(0, dtype=np.int64)
+    # Серия отсортирована, поэтому свечи одной старшей свечи идут подряд.
+    first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return type(series)(
+        starts[first],
+        series.open[first],
+        np.maximum.reduceat(series.high, first),
+        np.minimum.reduceat(series.low, first),
+        series.close[last],
+        np.add.reduceat(series.volume, first)), first
+
+
+# Функция для построения свечей старшего таймфрейма из младших.
+def resample_candles(series, time_frame: str, sessions: tuple = MOEX_SESSIONS,
+                     utc_offset: int = MOSCOW_UTC_OFFSET):
+    """
+    Строит свечи старшего таймфрейма из отсортированной по времени серии младших свечей.
+    Границы свечей считаются по московскому времени; свечи разных торговых сессий
+    не объединяются, а дневные свечи включают все сессии московской даты.
+    :param series: Серия младших свечей CandleSeries (например, M1).
+    :param time_frame: Старший таймфрейм (format:M5;M15;M30;H1;H4;D1).
+    :param sessions: Торговые сессии, минуты от полуночи по местному времени.
+    :param utc_offset: Смещение местного времени биржи от UTC в секундах.
+    :return: Серия свечей старшего таймфрейма.
+    """
+    result, _ = _aggregate(series, _bucket_starts(series.timestamps, time_frame, sessions, utc_offset))
+    return result
+
+
+# Инкрементальное построение свечей старшего таймфрейма.
+class CandleResampler:
+    """
+    Поддерживает свечи старшего таймфрейма при дописывании младших свечей.
+    Завершенные свечи не пересчитываются: при каждом обновлении агрегируются
+    только младшие свечи последней (незавершенной) старшей свечи и новые свечи.
+    """
+
+    def __init__(self, time_frame: str, sessions: tuple = MOEX_SESSIONS,
+                 utc_offset: int = MOSCOW_UTC_OFFSET):
+        """
+        Инициализация.
+        :param time_frame: Старший таймфрейм (format:M5;M15;M30;H1;H4;D1).
+        :param sessions: Торговые сессии, минуты от полуночи по местному времени.
+        :param utc_offset: Смещение местного времени биржи от UTC в секундах.
+        """
+        self.time_frame = time_frame
+        self.sessions = sessions
+        self.utc_offset = utc_offset
+        self._closed = []
+        self._current = None
+        self._tail = None
+
+    # Метод для добавления новых младших свечей.
+    def update(self, series):
+        """
+        Добавляет младшие свечи, идущие после уже добавленных.
+        Свечи, не новее последней добавленной, отбрасываются.
+        :param series: Серия новых младших свечей CandleSeries.
+        :return: Старшие свечи, затронутые обновлением; последняя из них может быть незавершенной.
+        """
+        if self._tail is not None:
+            series = type(series).concat([self._tail, series.between(start=int(self._tail.timestamps[-1]) + 1)])
+        if not len(series):
+            return series
+        updated, first = _aggregate(
+            series, _bucket_starts(series.timestamps, self.time_frame, self.sessions, self.utc_offset))
+        if len(updated) > 1:
+            self._closed.append(updated[:-1])
+        self._current = updated[-1:]
+        # Младшие свечи последней старшей свечи понадобятся для ее пересчета при следующем обновлении.
+        self._tail = series[int(first[-1]):]
+        return updated
+
+    # Завершенные старшие свечи.
+    @property
+    def closed(self):
+        """
+        Завершенные старшие свечи (None до первого обновления).
+        """
+        if self._current is None:
+            return None
+        # Склеиваем накопленные куски, чтобы не хранить множество мелких серий.
+        if len(self._closed) > 1:
+            self._closed = [type(self._current).concat(self._closed)]
+        return self._closed[0] if self._closed else self._current[0:0]
+
+    # Все старшие свечи, включая текущую незавершенную.
+    @property
+    def series(self):
+        """
+        Все старшие свечи, включая последнюю незавершенную (None до первого обновления).
+        Каждое обращение создает новую серию.
+        """
+        if self._current is None:
+            return None
+        return type(self._current).concat([self.closed, self._current])
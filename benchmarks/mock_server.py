@@ -0,0 +1,168 @@
+"""
+Локальный сервер-заглушка Trade API Finam для бенчмарков
+приложения async-finam-rest-api-client.
+
+Запуск отдельно: python -m benchmarks.mock_server --port 8080 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from app.utils import json_dumps
+
+
+# Функция для генерации свечей в формате сервера.
+def make_candles(count: int, intraday: bool) -> list:
+    """
+    Генерирует последовательность свечей в формате ответа Trade API.
+    :param count: Количество свечей.
+    :param intraday: Интрадейные свечи (поле timestamp) или дневные (поле date).
+    :return: Список словарей свечей.
+    """
+    start = datetime(2024, 1, 1, 7, 0)
+    step = timedelta(minutes=1) if intraday else timedelta(days=1)
+    candles = []
+    for index in range(count):
+        moment = start + step * index
+        price = 28000 + index % 100
+        candle = {
+            "open": {"num": price, "scale": 2},
+            "close": {"num": price + 5, "scale": 2},
+            "high": {"num": price + 10, "scale": 2},
+            "low": {"num": price - 10, "scale": 2},
+            "volume": 100 + index % 50,
+        }
+        if intraday:
+            candle["timestamp"] = moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+        else:
+            candle["date"] = moment.strftime("%Y-%m-%d")
+        candles.append(candle)
+    return candles
+
+
+# Сервер-заглушка с настраиваемой задержкой, размером ответа и долей ошибок.
+class MockServer:
+    """
+    Имитирует эндпоинты /day-candles, /intraday-candles, /securities, /portfolio,
+    /orders и /access-tokens/check. Ответы сериализуются заранее, чтобы
+    сервер не был узким местом бенчмарка.
+    """
+
+    def __init__(self, latency: float = 0.0, candles: int = 500, securities: int = 100,
+                 orders: int = 100, error_rate: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Инициализация сервера.
+        :param latency: Задержка перед каждым ответом в секундах.
+        :param candles: Количество свечей в ответах на запросы свечей.
+        :param securities: Количество инструментов в справочнике.
+        :param orders: Количество ордеров в ответе на запрос списка ордеров.
+        :param error_rate: Доля запросов, на которые сервер отвечает ошибкой 500.
+        :param host: Адрес, на котором слушает сервер.
+        :param port: Порт сервера (0 - любой свободный).
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._runner = None
+        self._transaction_id = 0
+        self._bodies = {
+            "day": json_dumps({"data": {"candles": make_candles(candles, False)}, "error": None}),
+            "intraday": json_dumps({"data": {"candles": make_candles(candles, True)}, "error": None}),
+            "securities": json_dumps({"data": {"securities": [
+                {"code": f"SEC{index}", "board": "TQBR", "market": "Stock", "decimals": 2,
+                 "lotSize": 10, "minStep": 1, "currency": "RUB", "shortName": f"Бумага {index}"}
+                for index in range(securities)]}, "error": None}),
+            "portfolio": json_dumps({"data": {"clientId": "BENCH", "equity": 1000000.0, "positions": [
+                {"securityCode": f"SEC{index}", "market": "Stock", "balance": 10, "currentPrice": 280.5}
+                for index in range(20)]}, "error": None}),
+            "orders": json_dumps({"data": {"clientId": "BENCH", "orders": [
+                {"orderNo": 1000 + index, "transactionId": index, "securityCode": "SBER",
+                 "buySell": "Buy", "status": "Active", "price": 280.5, "quantity": 10, "balance": 10}
+                for index in range(orders)]}, "error": None}),
+            "token": json_dumps({"data": {"id": 1}, "error": None}),
+            "cancel": json_dumps({"data": {"clientId": "BENCH"}, "error": None}),
+        }
+
+    # Адрес сервера для TradeAPIClient.
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # Обработчик, возвращающий заранее сериализованный ответ.
+    def _handler(self, name: str):
+        async def handle(request):
+            self.requests += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                return web.Response(status=500, text="Internal Server Error")
+            if request.method == "POST":
+                await request.read()
+                self._transaction_id += 1
+                body = json_dumps({"data": {"clientId": "BENCH", "transactionId": self._transaction_id},
+                                   "error": None})
+            else:
+                body = self._bodies[name]
+            return web.Response(body=body, content_type="application/json")
+        return handle
+
+    # Асинхронный метод для запуска сервера.
+    async def start(self) -> str:
+        """
+        Запускает сервер.
+        :return: Адрес сервера.
+        """
+        app = web.Application()
+        app.router.add_get("/day-candles", self._handler("day"))
+        app.router.add_get("/intraday-candles", self._handler("intraday"))
+        app.router.add_get("/securities", self._handler("securities"))
+        app.router.add_get("/portfolio", self._handler("portfolio"))
+        app.router.add_get("/orders", self._handler("orders"))
+        app.router.add_post("/orders", self._handler("orders"))
+        app.router.add_delete("/orders", self._handler("cancel"))
+        app.router.add_get("/access-tokens/check", self._handler("token"))
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # При port=0 узнаем порт, выбранный системой.
+        self.port = self._runner.addresses[0][1]
+        return self.url
+
+    # Асинхронный метод для остановки сервера.
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# Запуск сервера из командной строки.
+async def serve(args):
+    server = MockServer(latency=args.latency, candles=args.candles, error_rate=args.error_rate,
+                        host=args.host, port=args.port)
+    print(f"Сервер-заглушка запущен: {await server.start()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сервер-заглушка Trade API Finam")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, секунды")
+    parser.add_argument("--candles", type=int, default=500, help="свечей в ответе")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
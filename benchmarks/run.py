@@ -0,0 +1,279 @@
+"""
+Бенчмарк методов TradeAPIClient на локальном сервере-заглушке.
+
+Для каждого метода клиента выполняется серия запросов при возрастающей
+конкурентности и выводятся запросы в секунду, p50 и p99 задержки.
+Отдельно измеряется память на одну декодированную свечу CandleSeries.
+Каждый уровень измеряется несколько раз: в результат идут медиана rps,
+p50 и p99 по задержкам всех замеров и разброс между замерами.
+Результаты сравниваются с сохраненным базовым прогоном: регрессией считается
+ухудшение больше порога --threshold с учетом разброса замеров. Базовый прогон
+записывайте на той же машине и при той же нагрузке, что и сравниваемый.
+
+Запуск:
+    python -m benchmarks.run                     # прогон и сравнение с базовым
+    python -m benchmarks.run --save-baseline     # прогон и сохранение базового
+    python -m benchmarks.run --latency 0.01 --error-rate 0.01 --concurrency 1,8,64
+    python -m benchmarks.run --repeat 9 --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.client import TradeAPIClient
+from app.models import CandleSeries, unwrap_response
+from app.scheduler import RequestScheduler
+from app.utils import json_dumps
+from benchmarks.mock_server import MockServer, make_candles
+
+
+# Файл базового прогона по умолчанию.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "results", "baseline.json")
+
+# Допустимое ухудшение метрики относительно базового прогона по умолчанию.
+REGRESSION_THRESHOLD = 0.10
+
+# Количество замеров каждого уровня конкурентности по умолчанию.
+DEFAULT_REPEAT = 5
+
+# Максимум попыток прогревочного вызова при ошибках сервера.
+WARMUP_ATTEMPTS = 10
+
+# Данные ордера для бенчмарка place_order.
+ORDER_DATA = {
+    "clientId": "BENCH",
+    "securityBoard": "TQBR",
+    "securityCode": "SBER",
+    "buySell": "Buy",
+    "quantity": 1,
+    "useCredit": False,
+    "price": 280.5,
+    "property": "PutInQueue",
+    "condition": None,
+    "validBefore": {"type": "TillEndSession", "time": None},
+}
+
+# Сценарии: имя метода и функция, выполняющая один вызов.
+SCENARIOS = {
+    "check_access_token": lambda client: client.check_access_token(),
+    "get_day_candles": lambda client: client.get_day_candles(
+        "TQBR", "SBER", "D1", "2024-01-01", "2024-12-31", 0),
+    "get_day_candles_series": lambda client: client.get_day_candles_series(
+        "TQBR", "SBER", "D1", "2024-01-01", "2024-12-31", 0),
+    "get_intraday_candles": lambda client: client.get_intraday_candles(
+        "TQBR", "SBER", "M1", "2024-03-01T07:00:00", "2024-03-01T16:00:00", 0),
+    "get_intraday_candles_series": lambda client: client.get_intraday_candles_series(
+        "TQBR", "SBER", "M1", "2024-03-01T07:00:00", "2024-03-01T16:00:00", 0),
+    "get_portfolio": lambda client: client.get_portfolio("BENCH"),
+    "get_securities": lambda client: client.get_securities("TQBR", "SBER"),
+    "place_order": lambda client: client.place_order(ORDER_DATA),
+    "get_orders": lambda client: client.get_orders("BENCH", True, True, True),
+    "cancel_order": lambda client: client.cancel_order("BENCH", 1),
+}
+
+
+# Асинхронная функция для замера одного метода при заданной конкурентности.
+async def measure(client, call, requests: int, concurrency: int) -> dict:
+    """
+    Выполняет requests вызовов с concurrency одновременными обработчиками.
+    Ошибкой считается исключение, а для методов, возвращающих текст ответа, - ответ
+    не в формате JSON (например, тело ответа 500) или ответ с заполненным полем error.
+    :return: Запросы в секунду, p50 и p99 задержки в миллисекундах, количество ошибок
+             и задержки всех вызовов.
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                result = await call(client)
+                # Текстовые методы возвращают ответ с ошибкой, не поднимая исключения.
+                if isinstance(result, (str, bytes)):
+                    unwrap_response(result)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    values = np.array(latencies) * 1000
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "errors": errors,
+        "latencies_ms": values,
+    }
+
+
+# Функция для объединения повторных замеров одного уровня.
+def summarize(runs: list) -> dict:
+    """
+    Объединяет замеры measure: медиана rps, p50 и p99 по задержкам всех замеров,
+    суммы ошибок и относительный разброс rps и p99 между замерами
+    ((максимум - минимум) / итоговое значение).
+    """
+    latencies = np.concatenate([run["latencies_ms"] for run in runs])
+    result = {
+        "rps": float(np.median([run["rps"] for run in runs])),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+    for key in ("rps", "p99_ms"):
+        values = np.array([run[key] for run in runs])
+        result[f"{key}_spread"] = float((values.max() - values.min()) / result[key]) if result[key] else 0.0
+    result["errors"] = sum(run["errors"] for run in runs)
+    result["injected_errors"] = sum(run["injected_errors"] for run in runs)
+    result["runs"] = len(runs)
+    return result
+
+
+# Асинхронная функция для прогревочного вызова метода.
+async def warm_up(client, call):
+    """
+    Выполняет вызов, открывающий соединение до начала замера. При ошибке
+    (например, внедренной сервером-заглушкой) вызов повторяется до WARMUP_ATTEMPTS раз.
+    """
+    for _ in range(WARMUP_ATTEMPTS):
+        try:
+            await call(client)
+            return
+        except Exception:
+            continue
+
+
+# Функция для замера памяти на одну декодированную свечу.
+def measure_memory(bars: int) -> dict:
+    """
+    Декодирует ответ с bars интрадейными свечами и измеряет память через tracemalloc.
+    :return: Удерживаемая серией и пиковая память на одну свечу в байтах.
+    """
+    payload = json_dumps({"data": {"candles": make_candles(bars, True)}, "error": None})
+    tracemalloc.start()
+    try:
+        series = CandleSeries.from_json(payload)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"bars": len(series), "retained_bytes_per_bar": retained / bars, "peak_bytes_per_bar": peak / bars}
+
+
+# Асинхронная функция полного прогона бенчмарка.
+async def run(args) -> dict:
+    server = MockServer(latency=args.latency, candles=args.candles, error_rate=args.error_rate)
+    url = await server.start()
+    # По умолчанию лимиты планировщика сняты, чтобы измерять сам клиент, а не ограничение скорости.
+    if args.with_limits:
+        scheduler = RequestScheduler(max_retries=args.retries)
+    else:
+        unlimited = (1e9, 1e9)
+        scheduler = RequestScheduler(
+            rate_limits={group: unlimited for group in ("orders", "account", "data")},
+            global_rate_limit=unlimited, max_retries=args.retries)
+    results = {"methods": {}}
+    try:
+        async with TradeAPIClient("BENCH", url, scheduler=scheduler) as client:
+            for name in args.methods:
+                results["methods"][name] = {}
+                for concurrency in args.concurrency:
+                    # Прогревочный вызов открывает соединение до начала замера.
+                    await warm_up(client, SCENARIOS[name])
+                    runs = []
+                    for _ in range(args.repeat):
+                        injected = server.errors
+                        run_result = await measure(client, SCENARIOS[name], args.requests, concurrency)
+                        run_result["injected_errors"] = server.errors - injected
+                        runs.append(run_result)
+                    result = summarize(runs)
+                    results["methods"][name][str(concurrency)] = result
+                    print(f"{name:<30} c={concurrency:<4} {result['rps']:>9.1f} rps  "
+                          f"p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+                          f"(±{result['p99_ms_spread']:.0%})  "
+                          f"errors {result['errors']} (injected {result['injected_errors']})")
+    finally:
+        await server.stop()
+    results["memory"] = measure_memory(args.memory_bars)
+    print(f"Память на свечу: {results['memory']['retained_bytes_per_bar']:.1f} байт "
+          f"(пик декодирования {results['memory']['peak_bytes_per_bar']:.1f} байт)")
+    results["server"] = {"requests": server.requests, "injected_errors": server.errors}
+    return results
+
+
+# Функция для сравнения результатов с базовым прогоном.
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Сравнивает прогон с базовым и возвращает описания регрессий.
+    Регрессией считается падение rps или рост p99 сильнее допуска: порога threshold
+    плюс разброс повторных замеров обоих прогонов. Для памяти допуск равен порогу.
+    """
+    regressions = []
+    for name, levels in results["methods"].items():
+        for concurrency, result in levels.items():
+            base = baseline.get("methods", {}).get(name, {}).get(concurrency)
+            if base is None:
+                continue
+            tolerance = threshold + base.get("rps_spread", 0.0) + result.get("rps_spread", 0.0)
+            if result["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"{name} c={concurrency}: rps {base['rps']:.1f} -> {result['rps']:.1f} "
+                                   f"(допуск {tolerance:.0%})")
+            tolerance = threshold + base.get("p99_ms_spread", 0.0) + result.get("p99_ms_spread", 0.0)
+            if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{name} c={concurrency}: p99 {base['p99_ms']:.2f} -> "
+                                   f"{result['p99_ms']:.2f} ms (допуск {tolerance:.0%})")
+    base_memory = baseline.get("memory", {}).get("retained_bytes_per_bar")
+    memory = results["memory"]["retained_bytes_per_bar"]
+    if base_memory and memory > base_memory * (1 + threshold):
+        regressions.append(f"память на свечу {base_memory:.1f} -> {memory:.1f} байт")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк TradeAPIClient на сервере-заглушке")
+    parser.add_argument("--requests", type=int, default=200, help="запросов в одном замере уровня конкурентности")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="замеров каждого уровня, берется медиана")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="минимальный допуск ухудшения относительно базового прогона")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        type=lambda value: [int(item) for item in value.split(",")])
+    parser.add_argument("--methods", default=",".join(SCENARIOS),
+                        type=lambda value: value.split(","), help="методы через запятую")
+    parser.add_argument("--latency", type=float, default=0.002, help="задержка сервера, секунды")
+    parser.add_argument("--candles", type=int, default=500, help="свечей в ответе сервера")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500")
+    parser.add_argument("--retries", type=int, default=0, help="повторы планировщика при 429/5xx")
+    parser.add_argument("--with-limits", action="store_true", help="использовать лимиты из settings")
+    parser.add_argument("--memory-bars", type=int, default=100000, help="свечей для замера памяти")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="файл базового прогона")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить прогон как базовый")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+        print(f"Базовый прогон сохранен: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print("Регрессии относительно базового прогона:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print("Регрессий относительно базового прогона нет")
+
+
+if __name__ == "__main__":
+    main()